@@ -3,8 +3,12 @@
 """
 MediaSlayer - Main Launcher
 Simple entry point that launches the GUI from src/
+(``--cli`` runs the headless command line and ``--daemon`` the local HTTP
+API instead, both without importing Tk). URL arguments are queued; when a
+window is already open they are handed to it and this process exits.
 """
 
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -13,8 +17,33 @@ from pathlib import Path
 src_dir = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_dir))
 
-# Import and run the main GUI
-from media_downloader_gui import main
+from startup_profile import PROFILE  # marca o início do cold start
+
+
+def main():
+    args = sys.argv[1:]
+    if "--cli" in args:
+        args.remove("--cli")
+        from cli import main as cli_main
+        return cli_main(args)
+    if "--daemon" in args:
+        args.remove("--daemon")
+        from daemon_server import main as daemon_main
+        return daemon_main(args)
+
+    # Janela já aberta: repassar as URLs a ela e sair sem carregar Tk/yt-dlp
+    urls = [arg for arg in args if not arg.startswith("-")]
+    from single_instance import forward_to_running
+    if forward_to_running(urls):
+        return 0
+
+    # Import and run the main GUI
+    with PROFILE.measure("import media_downloader_gui"):
+        from media_downloader_gui import main as gui_main
+    gui_main(urls)
+    return 0
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    multiprocessing.freeze_support()  # worker processes in frozen builds
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+bench_segmented.py
+------------------
+Compares single-connection and segmented download throughput against a
+local HTTP server that supports Range requests and caps the speed of each
+connection (like the CDNs that throttle per stream). Also checks that an
+interrupted segmented download resumes from its checkpoint.
+
+Run with:
+    python scripts/bench_segmented.py [--size-mb 32] [--per-connection-mbps 4] [--connections 4]
+"""
+import argparse
+import functools
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from segmented_downloader import SegmentedDownloader  # noqa: E402
+from throughput import format_bytes  # noqa: E402
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves one in-memory payload with Range support and a per-connection speed cap"""
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, payload=None, rate=None, **kwargs):
+        self.payload = payload
+        self.rate = rate
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        size = len(self.payload)
+        start, end = 0, size - 1
+        header = self.headers.get("Range")
+        if header and header.startswith("bytes="):
+            first, _, last = header[6:].partition("-")
+            start = int(first) if first else size - int(last)
+            end = min(int(last), size - 1) if first and last else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        chunk = 64 * 1024
+        began = time.monotonic()
+        sent = 0
+        try:
+            for offset in range(start, end + 1, chunk):
+                data = self.payload[offset:min(offset + chunk, end + 1)]
+                self.wfile.write(data)
+                sent += len(data)
+                # Limite de vazão por conexão
+                ahead = sent / self.rate - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+        except (ConnectionError, BrokenPipeError):
+            pass
+
+
+def start_server(payload, rate):
+    handler = functools.partial(RangeHandler, payload=payload, rate=rate)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed_download(url, path, connections, progress=None):
+    started = time.perf_counter()
+    SegmentedDownloader(url, path, connections=connections, min_segment=1024 * 1024,
+                        progress=progress).download()
+    return time.perf_counter() - started
+
+
+def sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class _Interrupt(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segmented vs single-connection download benchmark")
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--per-connection-mbps", type=float, default=4.0,
+                        help="server speed cap per connection in MB/s (default: 4)")
+    parser.add_argument("--connections", type=int, default=4)
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    expected = hashlib.sha1(payload).hexdigest()
+    server = start_server(payload, args.per_connection_mbps * 1024 * 1024)
+    url = f"http://127.0.0.1:{server.server_port}/payload.bin"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Payload {format_bytes(len(payload))}, server cap "
+              f"{args.per_connection_mbps:g} MB/s per connection\n")
+        results = {}
+        for connections in sorted({1, args.connections}):
+            path = os.path.join(tmp, f"single-{connections}.bin")
+            elapsed = timed_download(url, path, connections)
+            ok = "ok" if sha1(path) == expected else "CORRUPT"
+            results[connections] = elapsed
+            print(f"{connections} connection(s): {elapsed:6.2f} s  "
+                  f"{format_bytes(len(payload) / elapsed)}/s  [{ok}]")
+
+        if args.connections in results and 1 in results and args.connections != 1:
+            print(f"\nSpeed-up: {results[1] / results[args.connections]:.2f}x")
+
+        # Interromper no meio e retomar pelo checkpoint
+        path = os.path.join(tmp, "resume.bin")
+
+        def interrupt(d):
+            if d["downloaded_bytes"] >= len(payload) // 2:
+                raise _Interrupt()
+        try:
+            timed_download(url, path, args.connections, progress=interrupt)
+        except _Interrupt:
+            pass
+        checkpoint = SegmentedDownloader(url, path)
+        checkpoint.size = len(payload)
+        checkpoint.plan_segments()
+        done = checkpoint.downloaded
+        elapsed = timed_download(url, path, args.connections)
+        ok = "ok" if sha1(path) == expected else "CORRUPT"
+        print(f"\nResume: {format_bytes(done)} kept from the checkpoint, "
+              f"rest fetched in {elapsed:.2f} s  [{ok}]")
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+startup_report.py
+-----------------
+Measures the MediaSlayer cold start: module imports, window setup, styles,
+UI construction, gradient rendering and time to first paint. yt-dlp is
+imported last (as the app does after the window is up) so its cost shows
+up separately. The app runs against a throwaway data directory, so the
+user's journal, metadata cache and instance token are left alone.
+
+Run with:
+    python scripts/startup_report.py [--budget-ms 800]
+
+Exits with status 1 when first paint takes longer than the budget, so it can
+be used to catch startup regressions.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from startup_profile import PROFILE  # noqa: E402  (T0 = início da medição)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MediaSlayer startup timing report")
+    parser.add_argument("--budget-ms", type=float, default=800.0,
+                        help="maximum time to first paint (default: 800)")
+    args = parser.parse_args()
+
+    # Diretório de dados descartável: nada do usuário é aberto ou compactado
+    data_dir = tempfile.mkdtemp(prefix="mediaslayer-startup-")
+    os.environ["MEDIASLAYER_HOME"] = data_dir
+
+    with PROFILE.measure("import tkinter"):
+        import tkinter as tk
+    with PROFILE.measure("import media_downloader_gui"):
+        import media_downloader_gui
+    import ytdlp_loader
+
+    with PROFILE.measure("tk.Tk()"):
+        root = tk.Tk()
+    app = media_downloader_gui.MediaSlayerGUI(root)
+
+    # Processar eventos até a primeira pintura (after_idle do app)
+    while "first_paint" not in PROFILE.marks:
+        root.update()
+
+    yt_dlp_was_loaded = ytdlp_loader.is_loaded()
+    ytdlp_loader.load_yt_dlp()
+
+    app.bridge.stop()
+    app.analyzer.stop()
+    app.instance.stop()
+    if app.journal is not None:
+        app.journal.close()
+    app.engine.shutdown()
+    root.destroy()
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(PROFILE.report())
+    if yt_dlp_was_loaded:
+        print("\n⚠️  yt_dlp was imported before first paint")
+
+    first_paint = PROFILE.marks["first_paint"]
+    print(f"\nFirst paint: {first_paint:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if first_paint > args.budget_ms or yt_dlp_was_loaded:
+        print("❌ Startup budget exceeded")
+        return 1
+    print("✅ Within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
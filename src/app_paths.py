@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Application paths
+Diretório de dados do usuário (configurações, caches, journal)
+"""
+
+import os
+
+
+def data_dir():
+    """Per-user data directory, created on demand.
+
+    ``MEDIASLAYER_HOME`` overrides the default (%APPDATA%\\MediaSlayer on
+    Windows, ~/.mediaslayer elsewhere).
+    """
+    path = os.environ.get("MEDIASLAYER_HOME")
+    if not path:
+        if os.name == "nt" and os.environ.get("APPDATA"):
+            path = os.path.join(os.environ["APPDATA"], "MediaSlayer")
+        else:
+            path = os.path.join(os.path.expanduser("~"), ".mediaslayer")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_file(name):
+    """Path of a file inside the data directory"""
+    return os.path.join(data_dir(), name)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Bandwidth
+Limite de banda global (token bucket) com sub-limites opcionais por
+plataforma, compartilhado por todos os jobs e ajustável em tempo real.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Fatia máxima por vez na fila: jobs se alternam a cada 64 KB
+SLICE = 64 * 1024
+# Rajada máxima, em segundos de banda acumulada
+BURST = 0.25
+# Espera máxima antes de rechecar cancelamento / mudança de limite
+_MAX_WAIT = 0.25
+
+
+class TokenBucket:
+    """Bytes-per-second token bucket with FIFO turns.
+
+    ``rate`` None means unlimited. The bucket holds up to :data:`BURST`
+    seconds of tokens (at least one :data:`SLICE`). Waiters are served in arrival
+    order, and a caller identified by ``flow`` is always granted a whole
+    :data:`SLICE` per turn (the unused part stays as its credit), so
+    concurrent transfers share the rate evenly by bytes whatever their read
+    sizes. :meth:`set_rate` takes effect immediately, even for callers
+    already waiting.
+    """
+
+    def __init__(self, rate=None):
+        self._cond = threading.Condition()
+        self.rate = None
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._queue = deque()
+        self._credit = {}
+        self.set_rate(rate)
+
+    @property
+    def capacity(self):
+        return max((self.rate or 0) * BURST, SLICE)
+
+    def set_rate(self, rate):
+        with self._cond:
+            self._refill()
+            self.rate = rate if rate and rate > 0 else None
+            self._tokens = min(self._tokens, self.capacity)
+            self._cond.notify_all()
+
+    def take(self, nbytes, check=None, flow=None):
+        """Block until ``nbytes`` (<= SLICE) tokens are available"""
+        with self._cond:
+            if self.rate is None:
+                return
+            if flow is not None:
+                credit = self._credit.pop(flow, 0)
+                if credit >= nbytes:
+                    self._credit[flow] = credit - nbytes
+                    return
+                nbytes -= credit
+                grant = SLICE
+            else:
+                grant = nbytes
+            turn = object()
+            self._queue.append(turn)
+            try:
+                while True:
+                    if check is not None:
+                        check()
+                    if self.rate is None:
+                        return
+                    self._refill()
+                    first = self._queue[0] is turn
+                    if first and self._tokens >= grant:
+                        self._tokens -= grant
+                        if grant > nbytes:
+                            self._credit[flow] = grant - nbytes
+                        return
+                    wait = _MAX_WAIT
+                    if first:
+                        wait = min(wait, (grant - self._tokens) / self.rate)
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(turn)
+                self._cond.notify_all()
+
+    def forget(self, flow):
+        with self._cond:
+            self._credit.pop(flow, None)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+
+class BandwidthLimiter:
+    """Global bucket plus optional per-platform buckets.
+
+    A transfer draws every byte from its platform's bucket (if that
+    platform has a limit) and then from the global one.
+    """
+
+    def __init__(self, rate=None):
+        self.global_bucket = TokenBucket(rate)
+        self._platforms = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, rate, platform=None):
+        """Bytes/s for everything (``platform`` None) or one platform; None = unlimited"""
+        if platform is None:
+            self.global_bucket.set_rate(rate)
+            return
+        with self._lock:
+            bucket = self._platforms.get(platform)
+            if bucket is None:
+                bucket = self._platforms[platform] = TokenBucket()
+        bucket.set_rate(rate)
+
+    def limit(self, platform=None):
+        if platform is None:
+            return self.global_bucket.rate
+        bucket = self._platforms.get(platform)
+        return bucket.rate if bucket else None
+
+    def consume(self, nbytes, platform=None, check=None, flow=None):
+        """Account for ``nbytes`` just transferred, sleeping as needed.
+
+        ``flow`` identifies the transfer (e.g. the job id) for byte-fair
+        sharing; ``check`` is called while waiting and may raise to abort
+        (e.g. on cancellation).
+        """
+        bucket = self._platforms.get(platform) if platform else None
+        while nbytes > 0:
+            chunk = min(nbytes, SLICE)
+            if bucket is not None:
+                bucket.take(chunk, check, flow)
+            self.global_bucket.take(chunk, check, flow)
+            nbytes -= chunk
+
+    def forget(self, flow):
+        """Drop the leftover credit of a finished transfer"""
+        self.global_bucket.forget(flow)
+        for bucket in list(self._platforms.values()):
+            bucket.forget(flow)
+
+
+def parse_rate(text):
+    """``"2 MB/s"`` / ``"500 KB/s"`` / ``"Unlimited"`` -> bytes/s or None"""
+    parts = text.strip().split()
+    if not parts or not parts[0].replace('.', '', 1).isdigit():
+        return None
+    value = float(parts[0])
+    unit = parts[1].upper() if len(parts) > 1 else "B/S"
+    for prefix, factor in (("G", 1024 ** 3), ("M", 1024 ** 2), ("K", 1024)):
+        if unit.startswith(prefix):
+            return int(value * factor)
+    return int(value)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Bulk Import
+Importação em lote de URLs (texto, CSV ou JSON Lines, de arquivo ou da
+área de transferência): leitura preguiçosa, normalização, dedupe contra a
+fila e o histórico, e envio gradual para o engine em uma thread separada.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import threading
+import time
+
+from url_normalizer import canonical_url, dedupe_key, detect_platform, media_key
+
+_URL_RE = re.compile(r'https?://[^\s"\'<>,;]+', re.IGNORECASE)
+
+
+class ImportEntry:
+    """One URL read from a manifest, with optional per-line options"""
+
+    def __init__(self, url, format_type=None, quality=None):
+        self.url = url
+        self.format_type = format_type
+        self.quality = quality
+
+
+class ImportProgress:
+    """Counters of a running import (``fraction`` None when the size is unknown)"""
+
+    def __init__(self):
+        self.read = 0
+        self.added = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.fraction = None
+        self.done = False
+        self.error = None
+
+    def __str__(self):
+        text = f"{self.added} added, {self.duplicates} duplicate(s), {self.invalid} invalid"
+        if self.fraction is not None and not self.done:
+            text = f"{self.fraction * 100:.0f}% - " + text
+        return text
+
+
+# ----------------------------------------------------------------------
+# Leitura (geradores: uma linha por vez, memória constante)
+# ----------------------------------------------------------------------
+def iter_manifest(path, position=None):
+    """Entries of a ``.txt``/``.csv``/``.jsonl`` file, read line by line.
+
+    ``position`` (a one-item list) receives the byte offset read so far,
+    for progress reporting.
+    """
+    kind = _manifest_kind(path)
+    with open(path, 'rb') as f:
+        lines = _decoded_lines(f, position)
+        yield from _iter_entries(lines, kind)
+
+
+def iter_text(text):
+    """Entries of pasted text (format sniffed from the first line)"""
+    stripped = text.lstrip()
+    if stripped.startswith('{'):
+        kind = 'jsonl'
+    elif '\n' in stripped and ',' in stripped.split('\n', 1)[0]:
+        kind = 'csv'
+    else:
+        kind = 'txt'
+    yield from _iter_entries(io.StringIO(text), kind)
+
+
+def _manifest_kind(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if ext == '.csv':
+        return 'csv'
+    return 'txt'
+
+
+def _decoded_lines(f, position):
+    first = True
+    for raw in f:
+        if position is not None:
+            position[0] += len(raw)
+        line = raw.decode('utf-8-sig' if first else 'utf-8', 'replace')
+        first = False
+        yield line
+
+
+def _iter_entries(lines, kind):
+    if kind == 'jsonl':
+        yield from _iter_jsonl(lines)
+    elif kind == 'csv':
+        yield from _iter_csv(lines)
+    else:
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                # Uma linha pode ter várias URLs (texto colado de chats etc.)
+                for url in _URL_RE.findall(line) or [line]:
+                    yield ImportEntry(url)
+
+
+def _iter_jsonl(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield ImportEntry(line)  # contado como inválido adiante
+            continue
+        if isinstance(record, str):
+            yield ImportEntry(record)
+        elif isinstance(record, dict):
+            yield ImportEntry(str(record.get('url') or ''), record.get('format'), record.get('quality'))
+
+
+def _iter_csv(lines):
+    reader = csv.reader(lines)
+    columns = None
+    for row in reader:
+        cells = [cell.strip() for cell in row]
+        if not any(cells):
+            continue
+        if columns is None:
+            columns = [cell.lower() for cell in cells]
+            if 'url' in columns:
+                continue  # cabeçalho
+            columns = []
+        record = dict(zip(columns, cells)) if columns else {}
+        url = record.get('url') or next((cell for cell in cells if _URL_RE.match(cell)), '')
+        yield ImportEntry(url, record.get('format') or None, record.get('quality') or None)
+
+
+# ----------------------------------------------------------------------
+# Importação
+# ----------------------------------------------------------------------
+class BulkImporter:
+    """Stream manifest entries into a :class:`download_engine.DownloadEngine`.
+
+    Runs on its own thread; every URL is validated, normalised to its
+    canonical form and skipped if the same video/format/quality is already
+    queued, running or completed (:meth:`DownloadEngine.known_identities`)
+    or appeared earlier in the manifest. Only the dedupe keys are kept in
+    memory, never the manifest. New URLs reach the engine in batches of up
+    to ``batch_size`` (:meth:`DownloadEngine.submit_many`).
+    ``on_progress(progress)`` is called from the import thread at most every
+    ``progress_interval`` seconds and once at the end.
+    """
+
+    def __init__(self, engine, entries, format_type, quality, download_path,
+                 on_progress=None, total_bytes=None, position=None, progress_interval=0.1,
+                 batch_size=100):
+        self.engine = engine
+        self.entries = entries
+        self.format_type = format_type
+        self.quality = quality
+        self.download_path = download_path
+        self.on_progress = on_progress
+        self.total_bytes = total_bytes
+        self.position = position
+        self.progress_interval = progress_interval
+        self.batch_size = batch_size
+        self.progress = ImportProgress()
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_file(cls, engine, path, format_type, quality, download_path, on_progress=None):
+        position = [0]
+        return cls(engine, iter_manifest(path, position), format_type, quality, download_path,
+                   on_progress, total_bytes=os.path.getsize(path), position=position)
+
+    @classmethod
+    def from_text(cls, engine, text, format_type, quality, download_path, on_progress=None):
+        return cls(engine, iter_text(text), format_type, quality, download_path, on_progress)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="MediaSlayerBulkImport", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        progress = self.progress
+        known = self.engine.known_identities()
+        batch = []
+        last_report = 0.0
+        try:
+            for entry in self.entries:
+                if self._cancelled.is_set():
+                    break
+                progress.read += 1
+                request = self._prepare(entry, known)
+                if request is not None:
+                    batch.append(request)
+                now = time.monotonic()
+                if len(batch) >= self.batch_size or now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._flush(batch)
+                    self._report()
+        except Exception as e:  # leitura do arquivo ou extração da playlist
+            progress.error = e
+        if not self._cancelled.is_set():
+            self._flush(batch)
+        progress.done = True
+        self._report()
+
+    def _prepare(self, entry, known):
+        """Engine request for a new, valid entry; None (and counted) otherwise"""
+        url = entry.url.strip()
+        if not detect_platform(url):
+            self.progress.invalid += 1
+            return None
+        key = media_key(url)
+        if key is not None:
+            url = canonical_url(key)
+        format_type = entry.format_type or self.format_type
+        quality = entry.quality or self.quality
+        identity = (dedupe_key(url), format_type, quality)
+        if identity in known:
+            self.progress.duplicates += 1
+            return None
+        known.add(identity)
+        return (url, format_type, quality, self.download_path)
+
+    def _flush(self, batch):
+        # Um lote por vez: o dispatcher acorda uma vez por lote, não por URL
+        if not batch:
+            return
+        try:
+            self.engine.submit_many(batch)
+            self.progress.added += len(batch)
+        except RuntimeError as e:
+            self.progress.error = e
+            self._cancelled.set()
+        batch.clear()
+
+    def _report(self):
+        if self.total_bytes and self.position is not None:
+            self.progress.fraction = min(1.0, self.position[0] / self.total_bytes)
+        if self.on_progress is not None:
+            self.on_progress(self.progress)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - CLI
+Modo sem interface (servidores, cron): mesmo engine da GUI, progresso
+multiplexado no terminal e código de saída por job. Não importa Tk.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+
+from bandwidth import parse_rate
+from bulk_import import BulkImporter, ImportEntry
+from concurrency import AIMDController
+from download_engine import DownloadEngine, JobState
+from metadata_cache import open_default_cache
+from throughput import format_bytes, format_eta
+from url_normalizer import is_collection_url
+
+FORMATS = ("mp4", "mp3", "webm", "wav")
+QUALITIES = ("best", "1080p", "720p", "480p", "360p")
+
+# Código de saída de cada job; o do processo é o pior deles
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2  # como o argparse
+EXIT_CANCELLED = 3
+EXIT_INTERRUPTED = 130
+_JOB_EXIT = {JobState.COMPLETED: EXIT_OK, JobState.FAILED: EXIT_FAILED,
+             JobState.CANCELLED: EXIT_CANCELLED}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="run.py --cli",
+        description="Download YouTube / X (Twitter) media without the GUI.",
+        epilog="Exit status: 0 all jobs completed, 1 a job failed, 2 bad arguments or "
+               "nothing to download, 3 a job was cancelled, 130 interrupted.")
+    parser.add_argument("urls", nargs="*", metavar="URL",
+                        help="video, playlist or channel URLs")
+    parser.add_argument("-i", "--input", action="append", default=[], metavar="FILE",
+                        help="manifest with URLs (.txt, .csv or .jsonl); '-' reads stdin")
+    parser.add_argument("-f", "--format", default="mp4", choices=FORMATS)
+    parser.add_argument("-q", "--quality", default="720p", choices=QUALITIES)
+    parser.add_argument("-o", "--output", default=os.path.join(os.getcwd(), "downloads"),
+                        metavar="DIR", help="download folder (default: ./downloads)")
+    add_engine_options(parser)
+    parser.add_argument("--no-progress", action="store_true",
+                        help="only print job results (default when stdout is not a terminal)")
+    return parser
+
+
+def add_engine_options(parser):
+    """Engine flags shared by the CLI and the daemon"""
+    parser.add_argument("-j", "--jobs", type=int, default=3, metavar="N",
+                        help="parallel downloads (default: 3)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="adjust parallel downloads to the measured throughput (up to 2x --jobs "
+                             "in total; each platform stays capped at --jobs)")
+    parser.add_argument("-c", "--connections", type=int, default=4, metavar="N",
+                        help="HTTP connections per file (default: 4)")
+    parser.add_argument("--limit", metavar="RATE",
+                        help="total bandwidth limit, e.g. '2 MB/s' or '500 KB/s'")
+    parser.add_argument("--threads", action="store_true",
+                        help="run jobs in threads instead of worker processes")
+
+
+def create_engine(args, parser):
+    """:class:`DownloadEngine` configured from :func:`add_engine_options` flags"""
+    if args.jobs < 1 or args.connections < 1:
+        parser.error("--jobs and --connections must be at least 1")
+    limit = None
+    if args.limit:
+        limit = parse_rate(args.limit)
+        if limit is None:
+            parser.error(f"invalid --limit: {args.limit}")
+    concurrency = None
+    if args.adaptive:
+        concurrency = AIMDController(initial=args.jobs, maximum=max(args.jobs * 2, args.jobs + 1))
+    return DownloadEngine(max_workers=args.jobs, cache=open_default_cache(),
+                          executor="thread" if args.threads else "process",
+                          connections_per_download=args.connections, bandwidth_limit=limit,
+                          host_limits={"youtube": args.jobs, "twitter": args.jobs},
+                          concurrency=concurrency)
+
+
+# ----------------------------------------------------------------------
+# Progresso no terminal
+# ----------------------------------------------------------------------
+class TerminalProgress:
+    """Multiplexed progress: finished jobs scroll, running jobs are redrawn in place.
+
+    Without a TTY (or with ``live=False``) only one line per finished job is
+    printed, which keeps cron logs readable.
+    """
+
+    def __init__(self, engine, stream=sys.stdout, live=True):
+        self.engine = engine
+        self.stream = stream
+        self.live = live
+        self._progress = {}
+        self._reported = set()
+        self._lines = 0
+        self._lock = threading.Lock()
+        engine.add_listener(self.on_event)
+
+    def on_event(self, event, job, payload):
+        if event == "progress":
+            self._progress[job.id] = payload
+        elif event == "log" and payload[0] in ("error", "warning"):
+            with self._lock:
+                self._clear()
+                print(f"[#{job.id}] {payload[0]}: {payload[1]}", file=sys.stderr)
+
+    def render(self, importing=False):
+        with self._lock:
+            self._clear()
+            jobs = self.engine.jobs()
+            for job in jobs:
+                if job.is_finished and job.id not in self._reported:
+                    self._reported.add(job.id)
+                    self.stream.write(self._result_line(job) + "\n")
+            if self.live:
+                lines = [self._job_line(job) for job in jobs
+                         if not job.is_finished and job.state != JobState.QUEUED]
+                lines.append(self._summary_line(jobs, importing))
+                width = shutil.get_terminal_size().columns - 1
+                for line in lines:
+                    self.stream.write(line[:width] + "\n")
+                self._lines = len(lines)
+            self.stream.flush()
+
+    def _clear(self):
+        # Sobe até o início do bloco ao vivo e apaga até o fim da tela
+        if self._lines:
+            self.stream.write(f"\x1b[{self._lines}F\x1b[J")
+            self._lines = 0
+
+    def _job_line(self, job):
+        progress = self._progress.get(job.id) or {}
+        speed = progress.get('smoothed_speed')
+        rate = f"{format_bytes(speed)}/s" if speed else ""
+        eta = format_eta(progress.get('eta')) if speed else ""
+        return f"  #{job.id:<4} {job.state:<14} {job.percent:5.1f}%  {rate:>11} {eta:>7}  {job.title or job.url}"
+
+    def _summary_line(self, jobs, importing):
+        counts = {}
+        for job in jobs:
+            counts[job.state] = counts.get(job.state, 0) + 1
+        text = ", ".join(f"{count} {state}" for state, count in sorted(counts.items())) or "no jobs yet"
+        return f"  [{self.engine.max_workers} parallel] {text}{', listing...' if importing else ''}"
+
+    @staticmethod
+    def _result_line(job):
+        code = _JOB_EXIT.get(job.state, EXIT_FAILED)
+        detail = f" - {job.error}" if job.error and job.state == JobState.FAILED else ""
+        return f"exit={code} #{job.id} {job.state}: {job.title or job.url}{detail}"
+
+
+# ----------------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------------
+def _importers(engine, args, parser):
+    """One background importer per input: plain URLs, each playlist/channel, each manifest"""
+    importers = []
+    common = (args.format, args.quality, args.output)
+    plain = [url for url in args.urls if not is_collection_url(url)]
+    if plain:
+        importers.append(BulkImporter(engine, (ImportEntry(url) for url in plain), *common))
+    for url in args.urls:
+        if is_collection_url(url):
+            from playlist_expander import expand_playlist
+            importers.append(expand_playlist(engine, url, *common))
+    for path in args.input:
+        if path == "-":
+            importers.append(BulkImporter.from_text(engine, sys.stdin.read(), *common))
+        elif not os.path.isfile(path):
+            parser.error(f"manifest not found: {path}")
+        else:
+            importers.append(BulkImporter.from_file(engine, path, *common))
+    return importers
+
+
+def run(args, parser):
+    engine = create_engine(args, parser)
+    importers = _importers(engine, args, parser)
+    if not importers:
+        parser.error("no URLs given (pass URLs and/or --input FILE)")
+
+    live = not args.no_progress and sys.stdout.isatty()
+    if live and os.name == 'nt':
+        os.system('')  # habilita sequências ANSI no console do Windows
+    progress = TerminalProgress(engine, live=live)
+    engine.warm_up()
+    for importer in importers:
+        importer.start()
+
+    interrupted = False
+    try:
+        while True:
+            importing = any(importer.running for importer in importers)
+            progress.render(importing)
+            if not importing and all(job.is_finished for job in engine.jobs()):
+                break
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        interrupted = True
+        for importer in importers:
+            importer.cancel()
+        engine.cancel_all()
+        progress.render()
+    finally:
+        engine.shutdown()
+
+    for importer in importers:
+        status = importer.progress
+        if status.invalid or status.error:
+            print(f"Input: {status}" + (f" ({status.error})" if status.error else ""), file=sys.stderr)
+
+    jobs = engine.jobs()
+    if interrupted:
+        return EXIT_INTERRUPTED
+    if not jobs:
+        return EXIT_USAGE
+    return max(_JOB_EXIT.get(job.state, EXIT_FAILED) for job in jobs)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return run(args, parser)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Concurrency
+Controle adaptativo (AIMD) do número de jobs simultâneos, guiado pela
+vazão agregada medida, pelos erros e pela latência até o primeiro byte.
+"""
+
+import time
+from collections import deque
+
+
+class Decision:
+    """One controller step: limit change (or hold) and why"""
+
+    def __init__(self, limit, previous, reason, throughput, errors, latency, at=None):
+        self.limit = limit
+        self.previous = previous
+        self.reason = reason
+        self.throughput = throughput
+        self.errors = errors
+        self.latency = latency
+        self.at = time.time() if at is None else at
+
+    @property
+    def changed(self):
+        return self.limit != self.previous
+
+    def as_dict(self):
+        return {'at': round(self.at, 3), 'limit': self.limit, 'previous': self.previous,
+                'reason': self.reason, 'throughput': round(self.throughput),
+                'errors': self.errors,
+                'latency': None if self.latency is None else round(self.latency, 3)}
+
+    def __str__(self):
+        arrow = f"{self.previous} → {self.limit}" if self.changed else f"{self.limit}"
+        return f"{arrow}: {self.reason}"
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease job concurrency.
+
+    The engine calls :meth:`sample` every ``interval`` seconds with the
+    aggregate throughput of the last window, the errors seen in it, the
+    time-to-first-byte of the jobs started in it, and whether the queue had
+    more work than slots (``busy``). While busy, the limit grows by
+    ``increase`` as long as each step raises throughput by more than
+    ``plateau`` (fraction). It is multiplied by ``decrease`` when errors
+    show up or latency jumps above ``latency_factor`` times its running
+    baseline, and by the gentler ``plateau_decrease`` when a step brings no
+    gain. After a decrease it holds for ``cooldown`` windows so the new
+    level can be measured.
+    """
+
+    def __init__(self, initial=3, minimum=1, maximum=8, interval=5.0, increase=1,
+                 decrease=0.5, plateau=0.05, plateau_decrease=0.75, latency_factor=2.0,
+                 cooldown=2, history=50):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(maximum, initial))
+        self.interval = interval
+        self.increase = increase
+        self.decrease = decrease
+        self.plateau = plateau
+        self.plateau_decrease = plateau_decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.history = deque(maxlen=history)
+        self._probe_rate = None
+        self._hold = 0
+        self._latency_baseline = None
+
+    def sample(self, throughput, errors=0, latency=None, busy=True):
+        """Feed one window of measurements; returns the :class:`Decision`"""
+        previous = self.limit
+        jumped = self._latency_jumped(latency)
+
+        if errors:
+            reason = self._back_off(self.decrease, f"{errors} error(s)")
+        elif jumped:
+            reason = self._back_off(self.decrease, f"latency jumped to {latency:.1f}s")
+        elif self._hold:
+            self._hold -= 1
+            reason = "holding after back-off"
+        elif not busy:
+            # Sem fila esperando: mais slots não mudariam nada
+            self._probe_rate = None
+            reason = "holding, no queued work"
+        elif self._probe_rate is not None and throughput <= self._probe_rate * (1 + self.plateau):
+            reason = self._back_off(self.plateau_decrease, "throughput plateaued")
+        elif self.limit >= self.maximum:
+            self._probe_rate = None
+            reason = "holding at maximum"
+        else:
+            rising = self._probe_rate is not None
+            self._probe_rate = throughput
+            self.limit = min(self.maximum, self.limit + self.increase)
+            reason = "throughput rising" if rising else "probing for more throughput"
+
+        decision = Decision(self.limit, previous, reason, throughput, errors, latency)
+        self.history.append(decision)
+        return decision
+
+    def _back_off(self, factor, reason):
+        self.limit = max(self.minimum, int(self.limit * factor))
+        self._probe_rate = None
+        self._hold = self.cooldown
+        return reason
+
+    def _latency_jumped(self, latency):
+        if latency is None:
+            return False
+        baseline = self._latency_baseline
+        if baseline is not None and latency > baseline * self.latency_factor and latency - baseline > 1.0:
+            return True
+        # Média móvel só com janelas normais
+        self._latency_baseline = latency if baseline is None else 0.8 * baseline + 0.2 * latency
+        return False
+
+    def metrics(self):
+        """Current state and recent decisions (JSON-serialisable)"""
+        return {'limit': self.limit, 'minimum': self.minimum, 'maximum': self.maximum,
+                'interval': self.interval,
+                'latency_baseline': self._latency_baseline,
+                'decisions': [d.as_dict() for d in self.history]}
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Daemon Server
+Modo daemon: um processo aquecido com API JSON sobre HTTP em localhost
+para enviar URLs, listar e cancelar jobs, acompanhar o progresso (SSE)
+e consultar métricas. Usa o mesmo engine da GUI.
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bulk_import import BulkImporter
+from cli import FORMATS, QUALITIES, add_engine_options, create_engine
+from job_journal import open_default_journal
+from url_normalizer import detect_platform, is_collection_url
+
+DEFAULT_PORT = 8765
+# Eventos guardados por cliente SSE lento antes de descartar
+_CLIENT_QUEUE = 1000
+_KEEPALIVE = 15.0
+_MAX_BODY = 1024 * 1024
+_LOCAL_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+_JOB_PATH_RE = re.compile(r'^/api/jobs/(\d+)(?:/(cancel|retry))?$')
+
+
+class ApiError(Exception):
+    """Error answered to the client as ``{"error": message}``"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def job_to_dict(job, log_lines=0):
+    """JSON view of a :class:`download_engine.DownloadJob`"""
+    data = {
+        'id': job.id,
+        'url': job.url,
+        'platform': job.platform,
+        'format': job.format_type,
+        'quality': job.quality,
+        'path': job.download_path,
+        'state': job.state,
+        'title': job.title,
+        'percent': round(job.percent, 1),
+        'downloaded_bytes': job.downloaded_bytes,
+        'total_bytes': job.total_bytes,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+    if log_lines:
+        data['log'] = [list(entry) for entry in list(job.log)[-log_lines:]]
+    return data
+
+
+def event_to_dict(event, job, payload):
+    """JSON payload of an engine event for the SSE stream"""
+    data = {'event': event, 'job': job.id if job is not None else None}
+    if event == "added":
+        data['data'] = job_to_dict(job)
+    elif event == "state":
+        data['data'] = {'state': payload, 'error': job.error}
+    elif event == "log":
+        data['data'] = {'level': payload[0], 'message': payload[1]}
+    elif event == "concurrency":
+        data['data'] = payload.as_dict()
+    else:
+        data['data'] = payload
+    return data
+
+
+class EventBroadcaster:
+    """Fan engine events out to the connected SSE clients.
+
+    Each client has a bounded queue; a client too slow to keep up loses
+    its oldest events instead of slowing the engine down.
+    """
+
+    def __init__(self, engine):
+        self._clients = set()
+        self._lock = threading.Lock()
+        engine.add_listener(self.on_event)
+
+    def subscribe(self):
+        client = queue.Queue(maxsize=_CLIENT_QUEUE)
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def on_event(self, event, job, payload):
+        message = json.dumps(event_to_dict(event, job, payload), default=str)
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            while True:
+                try:
+                    client.put_nowait((event, message))
+                    break
+                except queue.Full:
+                    try:
+                        client.get_nowait()
+                    except queue.Empty:
+                        pass
+
+
+class DaemonServer(ThreadingHTTPServer):
+    """HTTP server bound to localhost that owns one :class:`DownloadEngine`"""
+
+    daemon_threads = True
+
+    def __init__(self, engine, host="127.0.0.1", port=DEFAULT_PORT, download_path=None):
+        super().__init__((host, port), DaemonHandler)
+        self.engine = engine
+        self.download_path = download_path or os.path.join(os.getcwd(), "downloads")
+        self.events = EventBroadcaster(engine)
+        self.importers = []
+        self.stopping = threading.Event()
+
+    def submit(self, body):
+        """Queue the URLs of a ``POST /api/jobs`` body; returns the response dict"""
+        urls = body.get('urls') or ([body['url']] if body.get('url') else [])
+        if not isinstance(urls, list) or not urls or not all(isinstance(url, str) for url in urls):
+            raise ApiError(400, "expected 'url' or a non-empty 'urls' list")
+        format_type, quality, download_path = self._options(body)
+
+        invalid = [url for url in urls if not detect_platform(url)]
+        if invalid:
+            raise ApiError(400, f"unsupported URL(s): {', '.join(invalid[:5])}")
+        collections = [url for url in urls if is_collection_url(url)]
+        videos = [url for url in urls if not is_collection_url(url)]
+
+        jobs = self.engine.submit_many([(url, format_type, quality, download_path) for url in videos])
+        for url in collections:
+            from playlist_expander import expand_playlist
+            self._start_import(expand_playlist(self.engine, url, format_type, quality, download_path))
+        return {'jobs': [job_to_dict(job) for job in jobs], 'expanding': collections}
+
+    def import_manifest(self, text, body):
+        """Stream a manifest (``POST /api/import``) into the queue in the background"""
+        self._start_import(BulkImporter.from_text(self.engine, text, *self._options(body)))
+        return {'importing': True}
+
+    def _options(self, body):
+        format_type = body.get('format', "mp4")
+        quality = body.get('quality', "720p")
+        if format_type not in FORMATS or quality not in QUALITIES:
+            raise ApiError(400, f"format must be one of {FORMATS} and quality one of {QUALITIES}")
+        return format_type, quality, body.get('path') or self.download_path
+
+    def _start_import(self, importer):
+        self.importers = [running for running in self.importers if running.running]
+        self.importers.append(importer.start())
+
+    def shutdown(self):
+        self.stopping.set()
+        for importer in self.importers:
+            importer.cancel()
+        super().shutdown()
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """Routes of the JSON API (see the README for the list)"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MediaSlayerDaemon"
+
+    def log_message(self, format, *args):
+        pass
+
+    # ------------------------------------------------------------------
+    # Roteamento
+    # ------------------------------------------------------------------
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        try:
+            self._check_origin()
+            path = urlsplit(self.path).path.rstrip('/')
+            if path == "/api/events" and method == "GET":
+                self._stream_events()
+                return
+            status, data = self._route(method, path)
+        except ApiError as e:
+            # O corpo pode não ter sido lido: não reaproveitar a conexão
+            self.close_connection = True
+            status, data = e.status, {'error': str(e)}
+        except Exception as e:
+            self.close_connection = True
+            status, data = 500, {'error': str(e)}
+        self._send_json(status, data)
+
+    def _route(self, method, path):
+        engine = self.server.engine
+        if path == "/api/jobs":
+            if method == "GET":
+                return 200, {'jobs': [job_to_dict(job) for job in engine.jobs()]}
+            if method == "POST":
+                return 201, self.server.submit(self._read_json())
+        elif path == "/api/import" and method == "POST":
+            text, body = self._read_manifest()
+            return 202, self.server.import_manifest(text, body)
+        elif path == "/api/metrics" and method == "GET":
+            return 200, engine.metrics()
+        else:
+            match = _JOB_PATH_RE.match(path)
+            if match:
+                return self._route_job(method, int(match.group(1)), match.group(2))
+        raise ApiError(404, f"no route for {method} {path or '/'}")
+
+    def _route_job(self, method, job_id, action):
+        engine = self.server.engine
+        job = engine.get_job(job_id)
+        if job is None:
+            raise ApiError(404, f"job {job_id} not found")
+        if action is None and method == "GET":
+            return 200, job_to_dict(job, log_lines=50)
+        if (action == "cancel" and method == "POST") or (action is None and method == "DELETE"):
+            if not engine.cancel(job_id):
+                raise ApiError(409, f"job {job_id} already {job.state}")
+            return 200, job_to_dict(job)
+        if action == "retry" and method == "POST":
+            retried = engine.retry(job_id)
+            if retried is None:
+                raise ApiError(409, f"job {job_id} is still {job.state}")
+            return 201, job_to_dict(retried)
+        raise ApiError(405, f"{method} not allowed here")
+
+    # ------------------------------------------------------------------
+    # Entrada / saída
+    # ------------------------------------------------------------------
+    def _check_origin(self):
+        # Só clientes locais: bloqueia páginas web (DNS rebinding / CSRF)
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        if host not in _LOCAL_HOSTS:
+            raise ApiError(403, "only localhost clients are accepted")
+        if self.headers.get('Origin'):
+            raise ApiError(403, "browser requests are not accepted")
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > _MAX_BODY:
+            raise ApiError(413, "request body too large")
+        return self.rfile.read(length)
+
+    def _read_json(self):
+        try:
+            body = json.loads(self._read_body() or b'{}')
+        except ValueError:
+            raise ApiError(400, "invalid JSON body")
+        if not isinstance(body, dict):
+            raise ApiError(400, "expected a JSON object")
+        return body
+
+    def _read_manifest(self):
+        """Plain-text manifest body; options come from the query string"""
+        query = {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+        return self._read_body().decode('utf-8', 'replace'), query
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_events(self):
+        """Server-Sent Events: one ``event:``/``data:`` block per engine event"""
+        events = self.server.events
+        client = events.subscribe()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            self.wfile.write(b": connected\n\n")
+            self.wfile.flush()
+            while not self.server.stopping.is_set():
+                try:
+                    event, message = client.get(timeout=_KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    self.wfile.write(f"event: {event}\ndata: {message}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except (ConnectionError, BrokenPipeError, OSError):
+            pass
+        finally:
+            events.unsubscribe(client)
+
+
+# ----------------------------------------------------------------------
+# Entrada pela linha de comando (run.py --daemon)
+# ----------------------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="run.py --daemon",
+        description="Serve a JSON-over-HTTP download API on localhost.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"TCP port on 127.0.0.1 (default: {DEFAULT_PORT})")
+    parser.add_argument("-o", "--output", default=os.path.join(os.getcwd(), "downloads"),
+                        metavar="DIR", help="default download folder (default: ./downloads)")
+    add_engine_options(parser)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    engine = create_engine(args, parser)
+    # Jobs pendentes sobrevivem a reinícios do daemon (journal próprio, não o da GUI)
+    journal = open_default_journal("daemon.journal")
+    if journal is not None:
+        journal.attach(engine)
+    try:
+        server = DaemonServer(engine, port=args.port, download_path=args.output)
+    except OSError as e:
+        print(f"Cannot listen on 127.0.0.1:{args.port}: {e}", file=sys.stderr)
+        engine.shutdown()
+        return 1
+
+    engine.warm_up()
+    if journal is not None:
+        resumed = journal.resume(engine)
+        if resumed:
+            print(f"Resumed {len(resumed)} unfinished job(s)")
+    print(f"MediaSlayer daemon listening on http://127.0.0.1:{args.port}/api/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stopping.set()
+        server.server_close()
+        if journal is not None:
+            journal.close()
+        engine.shutdown(cancel_jobs=journal is None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1011 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Download Engine
+Fila de downloads com pool limitado de workers, independente da interface.
+A GUI apenas submete jobs e observa os eventos emitidos pelo engine.
+"""
+
+import glob
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from download_task import TaskSink, run_download
+from format_planner import ffmpeg_available
+from postprocess import PostProcessCancelled, PostProcessPool, can_embed_thumbnail
+from media_info import is_info_fresh
+from process_pool import DownloadFailed, ProcessWorkerPool, WorkerCrashed
+from ytdlp_loader import load_yt_dlp, preload_async
+from bandwidth import BandwidthLimiter
+from host_scheduler import PERMANENT, RATE_LIMIT, HostScheduler, classify_error
+from throughput import ThroughputMeter
+from url_normalizer import canonical_url, dedupe_key, detect_platform, media_key
+
+
+class JobState:
+    """Estados possíveis de um job"""
+    QUEUED = "queued"
+    EXTRACTING = "extracting"
+    DOWNLOADING = "downloading"
+    POSTPROCESSING = "postprocessing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINAL = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled"""
+
+
+class JobStalled(Exception):
+    """Raised inside a worker when the watchdog flagged its transfer as stalled"""
+
+
+def build_format_selector(format_type, quality, can_merge=None):
+    """Generic yt-dlp format selector for a format/quality pair.
+
+    Used when no ``formats`` list is available to plan from, and as the
+    fallback of every :class:`format_planner.FormatPlan`.
+    """
+    if format_type == "mp3":
+        return "bestaudio/best"
+    elif format_type == "wav":
+        return "bestaudio[ext=wav]/bestaudio"
+
+    height = f"[height<={quality[:-1]}]" if quality in ("1080p", "720p", "480p", "360p") else ""
+    single = f"best{height}[ext={format_type}]/best{height}" + ("/best" if height else "")
+    if can_merge is None:
+        can_merge = ffmpeg_available()
+    if not can_merge:
+        return single
+    audio_ext = "m4a" if format_type == "mp4" else format_type
+    return (f"bestvideo{height}[ext={format_type}]+bestaudio[ext={audio_ext}]/"
+            f"bestvideo{height}+bestaudio/{single}")
+
+
+def build_extract_opts(platform):
+    """yt-dlp options shared by analysis and download.
+
+    Both paths must extract with the same options so an analysed info dict
+    can be handed to the download as-is.
+    """
+    opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'socket_timeout': 30,  # Add timeout to prevent hanging
+    }
+
+    # Add Twitter/X specific options
+    if platform == "twitter":
+        opts['extractor_args'] = {
+            'twitter': {
+                'api': ['syndication', 'legacy', 'graphql']  # Try multiple APIs
+            }
+        }
+    return opts
+
+
+class DownloadJob:
+    """A single submitted URL with its own state, progress and log"""
+
+    def __init__(self, job_id, url, platform, format_type, quality, download_path, info=None):
+        self.id = job_id
+        self.url = url
+        self.key = dedupe_key(url)
+        self.platform = platform
+        self.format_type = format_type
+        self.quality = quality
+        self.download_path = download_path
+
+        self.state = JobState.QUEUED
+        self.percent = 0.0
+        self.info = info
+        self.title = info.get('title') if info else None
+        self.error = None
+        self.log = deque(maxlen=500)
+        self.cancel_requested = False
+        self.holds_slot = False
+        self.partial_files = set()
+
+        # Watchdog de vazão
+        self.meter = ThroughputMeter()
+        self.transferring = False
+        self.slow_since = None
+        self.stalled = False
+        self.stall_retries = 0
+        self._file_bytes = {}
+        # Espera no limite de banda: esse tempo não conta como stall
+        self.throttled_total = 0.0
+        self.slow_throttled = 0.0
+        self._throttle_waiters = 0
+        self._throttled_since = None
+        self._throttle_lock = threading.Lock()
+
+        # Rate limit / erros transitórios: nova tentativa adiada
+        self.host_retries = 0
+        self.retry_at = 0.0
+        # Latência até o primeiro byte (controle adaptativo)
+        self.dispatched_at = None
+        self.first_byte_seen = False
+
+        # Progresso agregado, enviado à UI em ritmo fixo
+        self.downloaded_bytes = 0
+        self.total_bytes = None
+        self.speed = None
+        self.progress_dirty = False
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self):
+        return self.state in JobState.FINAL
+
+    def throttle_started(self):
+        with self._throttle_lock:
+            if self._throttle_waiters == 0:
+                self._throttled_since = time.monotonic()
+            self._throttle_waiters += 1
+
+    def throttle_finished(self):
+        with self._throttle_lock:
+            self._throttle_waiters -= 1
+            if self._throttle_waiters == 0:
+                self.throttled_total += time.monotonic() - self._throttled_since
+
+    def throttled_time(self, now):
+        """Seconds spent waiting on the bandwidth limiter, a wait in progress included.
+
+        Segment connections wait concurrently; overlapping waits count once.
+        """
+        with self._throttle_lock:
+            if self._throttle_waiters:
+                return self.throttled_total + now - self._throttled_since
+            return self.throttled_total
+
+    def __repr__(self):
+        return f"<DownloadJob #{self.id} {self.state} {self.url}>"
+
+
+class DownloadEngine:
+    """Bounded worker pool that runs download jobs in parallel.
+
+    Listeners are called from worker threads as ``callback(event, job, payload)``
+    with ``event`` one of ``"added"``, ``"state"``, ``"progress"`` or ``"log"``
+    (payload ``(level, message)``).
+    ``cache`` is an optional :class:`metadata_cache.MetadataCache` consulted
+    before any extraction.
+
+    Cancelling a running job frees its worker slot immediately; the transfer
+    itself is aborted from the progress hook on the next chunk it receives.
+    ``keep_partial_files`` is the resume policy for cancelled jobs: keep the
+    ``.part`` files so a later submission resumes, or delete them (default).
+
+    There is no overall timeout: a watchdog flags a transfer as stalled when
+    its throughput stays under ``stall_floor`` bytes/s for ``stall_grace``
+    seconds, and the job is retried (resuming its ``.part`` files) up to
+    ``max_stall_retries`` times. Time spent waiting on the bandwidth limit
+    doesn't count towards the grace period. Transfers that keep progressing
+    run as long as they need.
+
+    Progress from the yt-dlp hooks is aggregated per job and emitted at most
+    ``progress_fps`` times per second, so the event volume reaching the UI
+    does not grow with bandwidth. The ``"progress"`` payload is a dict with
+    ``percent``, ``downloaded_bytes``, ``total_bytes``, ``speed`` (as
+    reported by yt-dlp), ``smoothed_speed`` (sliding window) and ``eta``.
+
+    ``executor="process"`` runs each job in a pre-warmed worker process
+    (:mod:`process_pool`) instead of a thread: yt-dlp work no longer
+    competes with the UI for the GIL, cancellation terminates the process
+    and a crashing extractor only fails its own job.
+
+    Nothing heavy happens at construction: yt-dlp is imported on first use
+    and :meth:`warm_up` preloads it (and the worker processes) on demand.
+
+    FFmpeg work (merging video+audio, MP3/WAV conversion, remux, thumbnail
+    embedding when ``embed_thumbnail``) runs in a separate
+    :class:`postprocess.PostProcessPool` of ``postprocess_workers`` threads
+    (one per CPU by default). A job in ``POSTPROCESSING`` no longer holds its
+    download slot, so the network workers go straight to the next job.
+
+    ``connections_per_download`` > 1 fetches progressive HTTP streams in
+    that many byte ranges in parallel (:mod:`segmented_downloader`),
+    resuming from per-segment checkpoints.
+
+    Every received chunk, in every job, draws from one shared
+    :class:`bandwidth.BandwidthLimiter` (``bandwidth_limit`` bytes/s, None =
+    unlimited; per-platform sub-limits via :meth:`set_bandwidth_limit`), so
+    concurrent jobs split the limit evenly. Limits change live.
+
+    Jobs are also capped per host (their platform) by a
+    :class:`host_scheduler.HostScheduler` (``host_limits``, e.g.
+    ``{"youtube": 2}``). Failures are classified: a rate limit (HTTP 429,
+    bot check) pauses every queued job of that host for an exponentially
+    growing, jittered delay, a transient error retries the job alone after
+    a backoff, both up to ``max_host_retries`` times; anything else fails
+    the job right away.
+
+    ``concurrency`` is an optional :class:`concurrency.AIMDController`: it
+    then owns the number of parallel jobs (``max_workers`` is only its
+    starting point), adjusting it every ``interval`` seconds from the
+    aggregate throughput, retryable errors and time-to-first-byte. Each step
+    is emitted as a ``"concurrency"`` event (``job`` None, payload a
+    :class:`concurrency.Decision`); :meth:`metrics` / :meth:`dump_metrics`
+    expose the current state and the decision history.
+    """
+
+    def __init__(self, max_workers=3, cache=None, keep_partial_files=False,
+                 stall_floor=10 * 1024, stall_grace=30, max_stall_retries=2, progress_fps=5,
+                 executor="thread", postprocess_workers=None, embed_thumbnail=True,
+                 connections_per_download=1, bandwidth_limit=None, host_limits=None,
+                 max_host_retries=4, concurrency=None):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.concurrency = concurrency
+        if concurrency is not None:
+            max_workers = concurrency.limit
+        self.max_workers = max_workers
+        self.cache = cache
+        self.keep_partial_files = keep_partial_files
+        self.stall_floor = stall_floor
+        self.stall_grace = stall_grace
+        self.max_stall_retries = max_stall_retries
+        self.progress_fps = progress_fps
+        self.embed_thumbnail = embed_thumbnail
+        self.connections_per_download = connections_per_download
+        self.bandwidth = BandwidthLimiter(bandwidth_limit)
+        self.hosts = HostScheduler(host_limits)
+        self.max_host_retries = max_host_retries
+        self.postprocess_pool = PostProcessPool(postprocess_workers)
+        self.process_pool = None
+        if executor == "process":
+            self.process_pool = ProcessWorkerPool(max_workers)
+
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._jobs = {}
+        self._unfinished = {}
+        self._active = 0
+        self._closed = False
+        self._ids = itertools.count(1)
+        self._listeners = []
+        self._stop = threading.Event()
+
+        # Medições agregadas para o controle de concorrência
+        self.meter = ThroughputMeter()
+        self._window_errors = 0
+        self._window_latencies = []
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop,
+                                            name="MediaSlayerDispatcher", daemon=True)
+        self._dispatcher.start()
+        self._monitor = threading.Thread(target=self._monitor_loop,
+                                         name="MediaSlayerWatchdog", daemon=True)
+        self._monitor.start()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def add_listener(self, callback):
+        """Register an event callback (called from worker threads)"""
+        self._listeners.append(callback)
+
+    def submit(self, url, format_type="mp4", quality="720p", download_path=None, info=None):
+        """Queue a URL for download and return its job.
+
+        ``info`` is an info dict already extracted for ``url`` (e.g. by the
+        URL analysis); when its stream URLs are still valid the job skips
+        extraction and goes straight to format selection and transfer.
+        Submitting a video that is already queued or running with the same
+        format and quality (under any URL spelling) returns the existing job.
+        """
+        return self.submit_many([(url, format_type, quality, download_path, info)])[0]
+
+    def submit_many(self, requests):
+        """Queue several ``(url, format_type, quality, download_path[, info])`` at once.
+
+        Same rules as :meth:`submit`, but the queue lock is taken and the
+        dispatcher woken once for the whole batch (bulk imports). Every URL
+        is validated first; an invalid one raises ValueError and queues
+        nothing. Returns the jobs in order.
+        """
+        prepared = []
+        for request in requests:
+            url, format_type, quality, download_path = request[:4]
+            info = request[4] if len(request) > 4 else None
+            platform = detect_platform(url)
+            if not platform:
+                raise ValueError("Invalid URL! Please use a YouTube or X (Twitter) URL")
+            download_path = download_path or os.path.join(os.getcwd(), "downloads")
+            prepared.append((url, platform, format_type, quality, download_path, info))
+
+        jobs, added = [], []
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Download engine is shut down")
+            for url, platform, format_type, quality, download_path, info in prepared:
+                identity = (dedupe_key(url), format_type, quality)
+                job = self._unfinished.get(identity)
+                if job is None:
+                    job = DownloadJob(next(self._ids), url, platform, format_type, quality,
+                                      download_path, info)
+                    self._jobs[job.id] = job
+                    self._unfinished[identity] = job
+                    self._pending.append(job)
+                    added.append(job)
+                jobs.append(job)
+            if added:
+                self._cond.notify_all()
+
+        for job in added:
+            self._emit("added", job)
+        return jobs
+
+    def known_identities(self):
+        """``(dedupe key, format, quality)`` of every job not failed or cancelled"""
+        with self._cond:
+            return {(dedupe_key(job.url), job.format_type, job.quality)
+                    for job in self._jobs.values()
+                    if job.state not in (JobState.FAILED, JobState.CANCELLED)}
+
+    def cancel(self, job_id):
+        """Request cancellation of a queued or running job"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_finished:
+                return False
+            job.cancel_requested = True
+            queued = job in self._pending
+            if queued:
+                self._pending.remove(job)
+
+        if not queued:
+            self._log(job, "Cancelling quest...")
+        if job.state == JobState.POSTPROCESSING:
+            self.postprocess_pool.cancel(job.id)
+        # O slot é liberado já; a thread aborta no próximo chunk recebido
+        self._set_state(job, JobState.CANCELLED)
+        self._release_slot(job)
+        return True
+
+    def cancel_all(self):
+        """Cancel every job that has not finished yet"""
+        for job in self.jobs():
+            if not job.is_finished:
+                self.cancel(job.id)
+
+    def retry(self, job_id):
+        """Resubmit a finished job with the same options"""
+        job = self._jobs.get(job_id)
+        if job is None or not job.is_finished:
+            return None
+        return self.submit(job.url, job.format_type, job.quality, job.download_path)
+
+    def extract_info(self, url):
+        """Extract metadata for ``url`` without downloading (cache first)"""
+        info = self._cached_info(url)
+        if info is not None:
+            return info
+        with load_yt_dlp().YoutubeDL(build_extract_opts(detect_platform(url))) as ydl:
+            info = ydl.extract_info(url, download=False)
+        self._store_info(url, info)
+        return info
+
+    def set_bandwidth_limit(self, rate, platform=None):
+        """Bytes/s for all jobs (or one platform); None removes the limit. Applies to running jobs"""
+        self.bandwidth.set_limit(rate, platform)
+
+    def warm_up(self):
+        """Import yt-dlp / start worker processes in the background"""
+        if self.process_pool is not None:
+            self.process_pool.warm_async()
+        preload_async()
+
+    def get_job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Snapshot of all jobs in submission order"""
+        with self._cond:
+            return list(self._jobs.values())
+
+    def active_count(self):
+        with self._cond:
+            return self._active
+
+    def set_host_limit(self, host, limit):
+        """Max running jobs for ``host`` (a platform); None removes the cap"""
+        with self._cond:
+            self.hosts.set_limit(host, limit)
+            self._cond.notify_all()
+
+    def host_status(self):
+        """Per-host running count, cap and remaining backoff"""
+        with self._cond:
+            return self.hosts.snapshot()
+
+    def metrics(self):
+        """Snapshot of the engine's counters (JSON-serialisable)"""
+        with self._cond:
+            states = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            data = {
+                'time': round(time.time(), 3),
+                'max_workers': self.max_workers,
+                'active': self._active,
+                'queued': len(self._pending),
+                'jobs': states,
+                'throughput': round(self.meter.rate()),
+                'bytes_total': self.meter.total,
+                'bandwidth_limit': self.bandwidth.limit(),
+                'hosts': self.hosts.snapshot(),
+            }
+        data['concurrency'] = self.concurrency.metrics() if self.concurrency else None
+        data['cache'] = self.cache.stats() if self.cache is not None else None
+        return data
+
+    def dump_metrics(self, path):
+        """Write :meth:`metrics` to ``path`` as JSON (atomically)"""
+        temp = path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.metrics(), f, indent=2)
+        os.replace(temp, path)
+
+    def shutdown(self, cancel_jobs=True):
+        """Stop dispatching and cancel outstanding work.
+
+        With ``cancel_jobs=False`` unfinished jobs are left as they are
+        (``.part`` files included) so a journal can resume them later; a job
+        interrupted while post-processing keeps its downloaded streams and
+        only re-runs FFmpeg on resume.
+        """
+        if cancel_jobs:
+            self.cancel_all()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._stop.set()
+        self.postprocess_pool.shutdown()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    job, wait = self._next_runnable()
+                    if job is not None:
+                        break
+                    self._cond.wait(wait)
+                self._pending.remove(job)
+                job.holds_slot = True
+                self._active += 1
+                self.hosts.started(job.platform)
+                job.dispatched_at = time.monotonic()
+                job.first_byte_seen = False
+
+            threading.Thread(target=self._run_job, args=(job,),
+                             name=f"MediaSlayerJob-{job.id}", daemon=True).start()
+
+    def _next_runnable(self):
+        """First pending job whose host has room and no backoff (call under the lock).
+
+        Returns ``(job, None)``, or ``(None, seconds)`` to wait until the
+        nearest backoff expires (None = until notified).
+        """
+        if self._active >= self.max_workers:
+            return None, None
+        return self._first_ready(time.monotonic())
+
+    def _first_ready(self, now):
+        """Same as :meth:`_next_runnable`, ignoring the global worker limit"""
+        wake = None
+        for job in self._pending:
+            ready = self.hosts.ready_at(job.platform, now)
+            if ready is None:
+                continue
+            ready = max(ready, job.retry_at)
+            if ready <= now:
+                return job, None
+            wake = ready if wake is None else min(wake, ready)
+        return None, (None if wake is None else wake - now)
+
+    def _run_job(self, job):
+        requeue = False
+        try:
+            requeue = self._execute(job)
+        finally:
+            self._release_slot(job)
+            self.bandwidth.forget(job.id)
+        # Só depois de liberar o slot: uma nova tentativa despachada antes
+        # disso teria o slot (e o crédito de banda) dela liberado por esta thread
+        if requeue:
+            self._requeue(job)
+
+    def _release_slot(self, job):
+        with self._cond:
+            if not job.holds_slot:
+                return
+            job.holds_slot = False
+            self._active -= 1
+            self.hosts.finished(job.platform)
+            self._cond.notify_all()
+
+    def _execute(self, job):
+        """Run one attempt of ``job``; True when it must go back to the queue"""
+        job.started_at = job.started_at or time.time()
+        job.stalled = False
+        try:
+            os.makedirs(job.download_path, exist_ok=True)
+            ydl_opts = self._build_ydl_opts(job)
+            info, reused = self._resolve_info(job)
+
+            self._check_abort(job)
+            if self.process_pool is not None:
+                task = self._run_in_process(job, ydl_opts, info, reused)
+            else:
+                task = run_download(job.url, ydl_opts, info, reused, _JobSink(self, job),
+                                    request=(job.format_type, job.quality),
+                                    connections=self.connections_per_download)
+
+            if job.cancel_requested:
+                raise JobCancelled()
+            with self._cond:
+                self.hosts.succeeded(job.platform)
+            job.percent = 100.0
+            if task is not None:
+                self._start_postprocess(job, task)
+                return
+            self._log(job, "Download completed successfully!")
+            self._set_state(job, JobState.COMPLETED)
+
+        except JobCancelled:
+            self._finish_cancelled(job)
+        except Exception as e:
+            if job.cancel_requested:
+                # yt-dlp pode embrulhar a exceção levantada no hook
+                self._finish_cancelled(job)
+                return
+            if job.stalled:
+                return self._finish_stalled(job)
+            if self._retry_later(job, e):
+                return True
+            job.error = str(e)
+            self._log(job, str(e), "error")
+            self._set_state(job, JobState.FAILED)
+
+    def _run_in_process(self, job, ydl_opts, info, reused):
+        """Run the task in a pooled worker process and relay its messages"""
+        sink = _JobSink(self, job)
+        worker = self.process_pool.acquire()
+        healthy = False
+        try:
+            if info is not None:
+                info = load_yt_dlp().YoutubeDL.sanitize_info(info)
+            worker.run({'url': job.url, 'opts': ydl_opts, 'info': info, 'reused': reused,
+                        'request': (job.format_type, job.quality),
+                        'connections': self.connections_per_download})
+            while True:
+                # Cancelamento/stall: o processo é terminado no finally
+                self._check_abort(job)
+                if not worker.poll(0.2):
+                    if not worker.is_alive():
+                        raise WorkerCrashed(f"Worker process exited (code {worker.exitcode})")
+                    continue
+
+                message = worker.recv()
+                kind = message[0]
+                if kind == 'done':
+                    healthy = True
+                    return message[1]
+                elif kind == 'error':
+                    healthy = True
+                    raise DownloadFailed(message[1])
+                elif kind == 'extracting':
+                    sink.extracting()
+                elif kind == 'downloading':
+                    sink.downloading()
+                elif kind == 'info':
+                    sink.info(message[1])
+                elif kind == 'log':
+                    sink.log(message[2], message[1])
+                elif kind == 'progress':
+                    sink.progress(message[1])
+                elif kind == 'throttle':
+                    # Limite compartilhado: o worker espera a liberação do processo principal
+                    sink.throttle(message[1])
+                    worker.grant()
+        finally:
+            if healthy:
+                self.process_pool.release(worker)
+            else:
+                self.process_pool.discard(worker)
+
+    def _start_postprocess(self, job, task):
+        """Hand the downloaded files to the FFmpeg pool and free the download slot"""
+        self._log(job, f"Download finished, post-processing: {task.describe()}")
+        self._set_state(job, JobState.POSTPROCESSING)
+        self._check_abort(job)
+        self._release_slot(job)
+        self.postprocess_pool.submit(job.id, task, lambda error: self._finish_postprocess(job, task, error))
+
+    def _finish_postprocess(self, job, task, error):
+        """Runs on a post-processing thread once FFmpeg is done"""
+        if isinstance(error, PostProcessCancelled) and not job.cancel_requested:
+            # FFmpeg interrompido por shutdown(cancel_jobs=False): manter as
+            # entradas e o job em aberto; ao retomar, os streams já baixados
+            # são reaproveitados e só o pós-processamento roda de novo
+            self._log(job, "Post-processing interrupted by shutdown, downloaded files kept")
+            return
+        if isinstance(error, PostProcessCancelled) or job.cancel_requested:
+            if not self.keep_partial_files:
+                removed = task.remove_inputs()
+                if removed:
+                    self._log(job, f"Removed {removed} downloaded file(s)")
+            self._log(job, "Quest cancelled by user!")
+            self._set_state(job, JobState.CANCELLED)
+        elif error is not None:
+            job.error = str(error)
+            self._log(job, f"Post-processing failed, downloaded files kept: {error}", "error")
+            self._set_state(job, JobState.FAILED)
+        else:
+            self._log(job, f"Saved {os.path.basename(task.output)}")
+            self._log(job, "Download completed successfully!")
+            self._set_state(job, JobState.COMPLETED)
+
+    def _finish_cancelled(self, job):
+        """Runs on the job thread once the transfer has actually stopped"""
+        if not self.keep_partial_files:
+            removed = remove_partial_files(job.partial_files)
+            if removed:
+                self._log(job, f"Removed {removed} partial file(s)")
+        self._log(job, "Quest cancelled by user!")
+        self._set_state(job, JobState.CANCELLED)
+
+    def _finish_stalled(self, job):
+        """Retry a stalled job (True: requeue it); its .part files are kept so it resumes"""
+        if job.stall_retries >= self.max_stall_retries:
+            job.error = f"Transfer stalled below {self.stall_floor // 1024} KB/s"
+            self._log(job, f"{job.error} after {job.stall_retries} retries", "error")
+            self._set_state(job, JobState.FAILED)
+            return False
+
+        with self._cond:
+            self._window_errors += 1
+        job.stall_retries += 1
+        self._log(job, f"Retrying stalled transfer ({job.stall_retries}/{self.max_stall_retries})...")
+        return True
+
+    def _retry_later(self, job, error):
+        """Schedule a retry for a rate limit or transient error; False if the job must fail"""
+        kind = classify_error(error)
+        if kind == PERMANENT or job.host_retries >= self.max_host_retries:
+            return False
+
+        job.host_retries += 1
+        attempt = f"{job.host_retries}/{self.max_host_retries}"
+        with self._cond:
+            self._window_errors += 1
+            if kind == RATE_LIMIT:
+                # Pausa o host inteiro: todos os jobs na fila dele esperam juntos
+                delay = self.hosts.rate_limited(job.platform)
+                message = (f"Rate limited by {job.platform}, pausing its quests for "
+                           f"{delay:.0f}s (retry {attempt})")
+            else:
+                delay = self.hosts.retry_delay(job.host_retries)
+                job.retry_at = time.monotonic() + delay
+                message = f"Temporary error, retrying in {delay:.1f}s ({attempt})"
+        self._log(job, str(error), "warning")
+        self._log(job, message)
+        return True
+
+    def _requeue(self, job):
+        """Put a job back in the queue (keeping its .part files)"""
+        self._set_state(job, JobState.QUEUED)
+        with self._cond:
+            if job.cancel_requested or self._closed:
+                return
+            self._pending.append(job)
+            self._cond.notify_all()
+
+    def _resolve_info(self, job):
+        """Info to download from (analysis or cache) without touching the network.
+
+        Returns ``(info, reused)``; ``info`` is None when the task must
+        extract it itself.
+        """
+        info = job.info
+        if info is not None and not is_info_fresh(info):
+            self._log(job, "Pre-analysed stream URLs expired, refreshing...")
+            info = None
+        if info is not None:
+            return info, True
+
+        info = self._cached_info(job.url)
+        if info is None:
+            return None, False
+        self._set_state(job, JobState.EXTRACTING)
+        self._log(job, "Metadata cache hit, skipping extraction")
+        job.info = info
+        job.title = info.get('title')
+        return info, True
+
+    def _on_info(self, job, info):
+        """Info extracted by the task (thread or worker process)"""
+        self._store_info(job.url, info)
+        job.info = info
+        job.title = info.get('title')
+
+    def _cached_info(self, url):
+        if self.cache is None:
+            return None
+        # A chave do cache é o id da mídia (cache_key); no X ele não é o id do
+        # post da URL, então vale o alias gravado para a URL canônica
+        key = media_key(url)
+        alias = self.cache.lookup_url(canonical_url(key) if key else url)
+        return self.cache.get(alias or key)
+
+    def _store_info(self, url, info):
+        if self.cache is None or not info:
+            return
+        urls = [url]
+        key = media_key(url)
+        if key is not None and canonical_url(key) != url:
+            urls.append(canonical_url(key))  # qualquer grafia da URL encontra a entrada
+        try:
+            self.cache.put(info, urls=urls)
+        except Exception as e:
+            print(f"Metadata cache write failed: {e}", file=sys.stderr)
+
+    def _build_ydl_opts(self, job):
+        """Plain (picklable) yt-dlp options; hooks and logger are added by the task"""
+        ydl_opts = build_extract_opts(job.platform)
+        ydl_opts.update({
+            'outtmpl': os.path.join(job.download_path, '%(uploader)s - %(title)s.%(ext)s'),
+            'format': build_format_selector(job.format_type, job.quality),
+            'quiet': False,  # Enable verbose output for debugging
+            'no_warnings': False,  # Show warnings for debugging
+            # Poucas tentativas internas: rate limits e erros transitórios
+            # são repetidos pelo engine, com backoff por host
+            'retries': 1,
+            'extractor_retries': 1,
+            'noprogress': True,  # progresso vem dos hooks, não do texto do yt-dlp
+            # Leituras de tamanho fixo: o limite de banda é cobrado a cada bloco
+            'buffersize': 256 * 1024,
+            'noresizebuffer': True,
+        })
+        if job.format_type in ("mp4", "webm"):
+            ydl_opts['merge_output_format'] = job.format_type
+        # Só a transferência da imagem; o embed fica com o pool de pós-processamento
+        if self.embed_thumbnail and can_embed_thumbnail(job.format_type) and ffmpeg_available():
+            ydl_opts['writethumbnail'] = True
+        return ydl_opts
+
+    def _check_abort(self, job):
+        if job.cancel_requested:
+            raise JobCancelled()
+        if job.stalled:
+            raise JobStalled()
+
+    def _progress_hook(self, job, d):
+        """Hook de progresso (chamado pela thread do job)"""
+        if d.get('tmpfilename'):
+            job.partial_files.add(d['tmpfilename'])
+        if d.get('filename'):
+            job.partial_files.add(d['filename'] + '.part')
+        self._check_abort(job)
+
+        if d['status'] == 'downloading':
+            # Bytes novos desde o último callback (por arquivo); o primeiro
+            # callback só marca a base, pois já inclui o que veio do .part
+            filename = d.get('filename')
+            downloaded = d.get('downloaded_bytes') or 0
+            previous = job._file_bytes.get(filename)
+            if previous is None:
+                delta = 0
+            elif downloaded < previous:
+                delta = downloaded  # arquivo reiniciado do zero
+            else:
+                delta = downloaded - previous
+            job._file_bytes[filename] = downloaded
+            if not job.transferring:
+                job.transferring = True
+                job.slow_since = None
+                job.meter.reset()
+            if not job.first_byte_seen and job.dispatched_at is not None:
+                job.first_byte_seen = True
+                with self._cond:
+                    self._window_latencies.append(time.monotonic() - job.dispatched_at)
+            job.meter.add(delta)
+            self.meter.add(delta)
+
+            # Só agrega; o envio para a UI é feito pelo monitor em ritmo fixo
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            job.downloaded_bytes = downloaded
+            job.total_bytes = total
+            job.speed = d.get('speed')
+            if total:
+                job.percent = min(downloaded / total * 100, 100.0)
+            job.progress_dirty = True
+        elif d['status'] == 'finished':
+            job.transferring = False
+            job.percent = 100.0
+            job.speed = None
+            job.progress_dirty = True
+
+    # ------------------------------------------------------------------
+    # Monitor (progresso + watchdog)
+    # ------------------------------------------------------------------
+    def _monitor_loop(self):
+        """Flush coalesced progress at ``progress_fps`` and run the stall check every second"""
+        interval = 1.0 / self.progress_fps
+        last_stall_check = 0.0
+        last_adjust = time.monotonic()
+        last_bytes = 0
+        while not self._stop.wait(interval):
+            with self._cond:
+                running = [job for job in self._jobs.values() if job.holds_slot]
+
+            for job in running:
+                if job.progress_dirty:
+                    job.progress_dirty = False
+                    self._emit("progress", job, self._progress_snapshot(job))
+
+            now = time.monotonic()
+            if now - last_stall_check >= 1.0:
+                last_stall_check = now
+                for job in running:
+                    if job.state == JobState.DOWNLOADING:
+                        self._check_stall(job)
+
+            if self.concurrency is not None and now - last_adjust >= self.concurrency.interval:
+                total = self.meter.total
+                self._adjust_concurrency((total - last_bytes) / (now - last_adjust))
+                last_adjust, last_bytes = now, total
+
+    def _adjust_concurrency(self, throughput):
+        """One controller step with the measurements of the last window"""
+        with self._cond:
+            errors, self._window_errors = self._window_errors, 0
+            latencies, self._window_latencies = self._window_latencies, []
+            # Só conta como saturado se algum job pendente rodaria com mais
+            # workers; jobs parados pelo teto ou backoff do host não contam
+            busy = (self._active >= self.max_workers
+                    and self._first_ready(time.monotonic())[0] is not None)
+        latency = sum(latencies) / len(latencies) if latencies else None
+        decision = self.concurrency.sample(throughput, errors, latency, busy)
+        if decision.changed:
+            with self._cond:
+                self.max_workers = decision.limit
+                self._cond.notify_all()
+            if self.process_pool is not None:
+                self.process_pool.size = decision.limit
+        self._emit("concurrency", None, decision)
+
+    def _progress_snapshot(self, job):
+        """Payload of a coalesced "progress" event"""
+        smoothed = job.meter.rate() if job.transferring else 0.0
+        eta = None
+        if job.total_bytes and smoothed > 0:
+            eta = max(job.total_bytes - job.downloaded_bytes, 0) / smoothed
+        return {
+            'percent': job.percent,
+            'downloaded_bytes': job.downloaded_bytes,
+            'total_bytes': job.total_bytes,
+            'speed': job.speed,
+            'smoothed_speed': smoothed,
+            'eta': eta,
+        }
+
+    def _check_stall(self, job):
+        if not job.transferring or job.stalled:
+            return
+        now = time.monotonic()
+        if job.meter.rate(now) >= self.stall_floor:
+            job.slow_since = None
+            return
+        # Tempo parado esperando o limite de banda é lentidão nossa, não da rede
+        throttled = job.throttled_time(now)
+        if job.slow_since is None:
+            job.slow_since = now
+            job.slow_throttled = throttled
+        elif (now - job.slow_since) - (throttled - job.slow_throttled) >= self.stall_grace:
+            job.stalled = True
+            job.transferring = False
+            self._log(job, f"Transfer stalled: under {self.stall_floor // 1024} KB/s "
+                           f"for {self.stall_grace}s, aborting attempt", "warning")
+            # Libera o slot já; a thread antiga aborta no próximo chunk ou timeout
+            self._release_slot(job)
+
+    # ------------------------------------------------------------------
+    # Eventos
+    # ------------------------------------------------------------------
+    def _set_state(self, job, state):
+        with self._cond:
+            if job.state == state or job.is_finished:
+                return
+            job.state = state
+            if state in JobState.FINAL:
+                job.finished_at = time.time()
+                self._unfinished.pop((job.key, job.format_type, job.quality), None)
+        self._emit("state", job, state)
+
+    def _log(self, job, message, level="info"):
+        job.log.append((level, message))
+        self._emit("log", job, (level, message))
+
+    def _emit(self, event, job, payload=None):
+        for callback in list(self._listeners):
+            try:
+                callback(event, job, payload)
+            except Exception as e:
+                print(f"Engine listener error: {e}", file=sys.stderr)
+
+
+def remove_partial_files(paths):
+    """Delete ``.part``/``.ytdl``/fragment leftovers; returns how many were removed"""
+    candidates = set()
+    for path in paths:
+        base = path[:-len('.part')] if path.endswith('.part') else path
+        candidates.update((base + '.part', base + '.ytdl', base + '.part.segments'))
+        candidates.update(glob.glob(glob.escape(base) + '.part-Frag*'))
+
+    removed = 0
+    for path in candidates:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not remove partial file {path}: {e}", file=sys.stderr)
+    return removed
+
+
+class _JobSink(TaskSink):
+    """TaskSink that applies task reports to an engine job"""
+
+    def __init__(self, engine, job):
+        self._engine = engine
+        self._job = job
+
+    def extracting(self):
+        self._engine._set_state(self._job, JobState.EXTRACTING)
+
+    def downloading(self):
+        self._engine._set_state(self._job, JobState.DOWNLOADING)
+
+    def info(self, info):
+        self._engine._on_info(self._job, info)
+
+    def log(self, message, level="info"):
+        self._engine._log(self._job, message, level)
+
+    def progress(self, d):
+        self._engine._progress_hook(self._job, d)
+
+    def throttle(self, nbytes):
+        job = self._job
+        job.throttle_started()
+        try:
+            self._engine.bandwidth.consume(nbytes, job.platform, flow=job.id,
+                                           check=lambda: self._engine._check_abort(job))
+        finally:
+            job.throttle_finished()
+
+    def check_abort(self):
+        self._engine._check_abort(self._job)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Download Task
+Extração + transferência de um job com o yt-dlp. Roda tanto numa thread
+do engine quanto dentro de um processo worker (process_pool).
+"""
+
+import copy
+import os
+
+from format_planner import fits_container, plan_formats
+from media_info import is_expired_stream_error
+from postprocess import PostProcessTask, can_embed_thumbnail, ffmpeg_path
+from segmented_downloader import SegmentedDownloader, SegmentedUnsupported
+from ytdlp_loader import load_yt_dlp
+
+# Abaixo disso uma conexão só já basta
+_SEGMENTED_MIN_SIZE = 4 * 1024 * 1024
+
+
+class TaskSink:
+    """Receives everything a running task reports.
+
+    The engine implements it directly in thread mode; in process mode the
+    worker forwards each call over its pipe.
+    """
+
+    def extracting(self):
+        pass
+
+    def downloading(self):
+        pass
+
+    def info(self, info):
+        pass
+
+    def log(self, message, level="info"):
+        pass
+
+    def progress(self, d):
+        pass
+
+    def throttle(self, nbytes):
+        """Called with every chunk of bytes received; may sleep (bandwidth limit)"""
+        pass
+
+    def check_abort(self):
+        pass
+
+
+def run_download(url, ydl_opts, info, reused, sink, request=None, connections=1):
+    """Download ``url`` with plain (picklable) ``ydl_opts``.
+
+    ``info`` is an already resolved info dict or None to extract once here.
+    ``reused`` tells whether that info came from an earlier extraction, in
+    which case a 403/410 on the stream URLs triggers a single refresh.
+    ``request`` is the ``(format_type, quality)`` pair: streams are then
+    planned from the info's ``formats`` (see format_planner).
+
+    With ``connections`` > 1, planned progressive HTTP streams are fetched
+    by :class:`segmented_downloader.SegmentedDownloader` over that many
+    range requests (yt-dlp is the fallback when the server won't do ranges).
+
+    Returns the :class:`postprocess.PostProcessTask` left for the
+    post-processing pool (merge, conversion, thumbnail) or None.
+    """
+    yt_dlp = load_yt_dlp()
+    logger = YTDLogger(sink.log)
+
+    if info is None:
+        info = _extract(url, ydl_opts, logger, sink)
+
+    sink.check_abort()
+    try:
+        return _download(info, ydl_opts, logger, sink, request, connections)
+    except yt_dlp.utils.DownloadError as e:
+        # URLs assinadas podem expirar entre a análise e o download
+        if not reused or not is_expired_stream_error(e):
+            raise
+        sink.log("Stream URLs rejected, refreshing metadata once...")
+        info = _extract(url, ydl_opts, logger, sink)
+        return _download(info, ydl_opts, logger, sink, request, connections)
+
+
+def _extract(url, ydl_opts, logger, sink):
+    """Single extraction pass for a job without usable info"""
+    sink.extracting()
+    sink.log("Starting analysis of target URL...")
+    with load_yt_dlp().YoutubeDL(dict(ydl_opts, logger=logger)) as ydl:
+        info = ydl.extract_info(url, download=False)
+    if not info:
+        raise Exception("Could not extract video information")
+    sink.info(info)
+    return info
+
+
+def _download(info, ydl_opts, logger, sink, request, connections):
+    """Plan the streams for ``info``, transfer them and describe what FFmpeg has left to do"""
+    ydl_opts = dict(ydl_opts,
+                    progress_hooks=[sink.progress, _ThrottleHook(sink)],
+                    postprocessor_hooks=[lambda d: sink.check_abort()],
+                    logger=logger)
+    thumbnail = ydl_opts.pop('writethumbnail', False)
+    plan = None
+    if request is not None:
+        plan = plan_formats(info, request[0], request[1], ydl_opts['format'])
+        if plan is not None:
+            for line in plan.explain():
+                sink.log(line)
+            ydl_opts.update(plan.ydl_opts())
+
+    sink.downloading()
+    yt_dlp = load_yt_dlp()
+    if plan is None:
+        # Playlists / extractors sem lista de formatos: yt-dlp faz tudo
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.process_ie_result(info, download=True)
+        return None
+    if plan.merge_output_format:
+        return _download_streams(info, ydl_opts, plan, thumbnail, sink, connections)
+
+    stream = plan.video if plan.video is not None else plan.audio
+    path, thumbnail_path = _fetch_format(info, dict(ydl_opts, writethumbnail=thumbnail),
+                                         stream, sink, connections)
+    if path is None:
+        return None
+    return _single_file_task(path, thumbnail_path, request[0], plan, sink)
+
+
+def _download_streams(info, ydl_opts, plan, thumbnail, sink, connections):
+    """Video and audio as separate files; the merge is left to the pool"""
+    yt_dlp = load_yt_dlp()
+    container = plan.merge_output_format
+    base, ext = os.path.splitext(ydl_opts['outtmpl'])
+    # YoutubeDL normaliza o dict de opções recebido; sempre passar uma cópia
+    with yt_dlp.YoutubeDL(dict(ydl_opts)) as ydl:
+        output = os.path.splitext(ydl.prepare_filename(dict(info, ext=container)))[0] + '.' + container
+    if os.path.exists(output):
+        sink.log(f"{output} has already been downloaded")
+        return None
+
+    staged = dict(ydl_opts, outtmpl=f"{base}.f%(format_id)s{ext}")
+    inputs, thumbnail_path = [], None
+    for stream, write_thumbnail in ((plan.video, thumbnail), (plan.audio, False)):
+        sink.check_abort()
+        opts = dict(staged, format=stream['format_id'], writethumbnail=write_thumbnail)
+        path, thumbnail = _fetch_format(info, opts, stream, sink, connections)
+        if path is None:
+            raise Exception(f"Format {stream['format_id']} was not downloaded")
+        inputs.append(path)
+        thumbnail_path = thumbnail_path or thumbnail
+    return PostProcessTask(output, inputs, action="merge", thumbnail=thumbnail_path)
+
+
+def _fetch_format(info, ydl_opts, stream, sink, connections):
+    """Download one planned format; returns ``(path, thumbnail_path)``"""
+    yt_dlp = load_yt_dlp()
+    if connections > 1 and _segmentable(stream):
+        with yt_dlp.YoutubeDL(dict(ydl_opts)) as ydl:
+            path = ydl.prepare_filename(dict(info, format_id=stream['format_id'], ext=stream['ext']))
+        if os.path.exists(path):
+            sink.log(f"[download] {path} has already been downloaded")
+            return path, _write_thumbnail(info, ydl_opts)
+        downloader = SegmentedDownloader(stream['url'], path, headers=stream.get('http_headers'),
+                                         connections=connections, progress=sink.progress,
+                                         throttle=sink.throttle)
+        try:
+            downloader.probe()
+            sink.log(f"[download] Destination: {path} ({connections} connections)")
+            downloader.download()
+            return path, _write_thumbnail(info, ydl_opts)
+        except SegmentedUnsupported as e:
+            sink.log(f"Segmented download unavailable ({e}), using a single connection")
+            # O .part pré-alocado de uma execução anterior não serve para o yt-dlp
+            downloader.discard()
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        result = ydl.process_ie_result(copy.deepcopy(info), download=True)
+    return _downloaded_path(result), _thumbnail_path(result)
+
+
+def _segmentable(stream):
+    """Plain HTTP(S) file large enough to be worth splitting"""
+    size = stream.get('filesize') or stream.get('filesize_approx')
+    return (stream.get('protocol') in ('http', 'https') and bool(stream.get('url'))
+            and not stream.get('fragments') and (size is None or size >= _SEGMENTED_MIN_SIZE))
+
+
+def _write_thumbnail(info, ydl_opts):
+    """Thumbnail only (the media itself came from the segmented downloader)"""
+    if not ydl_opts.get('writethumbnail'):
+        return None
+    with load_yt_dlp().YoutubeDL(dict(ydl_opts, skip_download=True)) as ydl:
+        return _thumbnail_path(ydl.process_ie_result(copy.deepcopy(info), download=True))
+
+
+def _single_file_task(path, thumbnail_path, format_type, plan, sink):
+    """Conversion / remux / thumbnail left for a single downloaded file"""
+    base, ext = os.path.splitext(path)
+    ext = ext[1:].lower()
+    action = output = None
+    if format_type in ("mp3", "wav"):
+        if ext != format_type:
+            action, output = "extract_audio", f"{base}.{format_type}"
+    elif ext != format_type and plan.video is not None and fits_container(plan.video, format_type):
+        action, output = "remux", f"{base}.{format_type}"
+
+    if action and ffmpeg_path() is None:
+        sink.log(f"FFmpeg not found: keeping the downloaded .{ext} file", "warning")
+        return None
+    output = output or path
+    if thumbnail_path and not can_embed_thumbnail(output):
+        os.remove(thumbnail_path)
+        thumbnail_path = None
+    task = PostProcessTask(output, [path], action=action, codec=format_type, thumbnail=thumbnail_path)
+    return task if task.needed else None
+
+
+def _downloaded_path(result):
+    downloads = (result or {}).get('requested_downloads') or [{}]
+    return downloads[0].get('filepath')
+
+
+def _thumbnail_path(result):
+    for thumbnail in reversed((result or {}).get('thumbnails') or []):
+        if thumbnail.get('filepath') and os.path.exists(thumbnail['filepath']):
+            return thumbnail['filepath']
+    return None
+
+
+class _ThrottleHook:
+    """yt-dlp progress hook that passes the new bytes of each file to ``sink.throttle``.
+
+    ``downloaded_bytes`` includes what was resumed from an existing
+    ``.part``, so the first callback of each file only sets the baseline.
+    """
+
+    def __init__(self, sink):
+        self._sink = sink
+        self._seen = {}
+
+    def __call__(self, d):
+        if d.get('status') != 'downloading':
+            return
+        filename = d.get('filename')
+        downloaded = d.get('downloaded_bytes') or 0
+        previous = self._seen.get(filename)
+        self._seen[filename] = downloaded
+        if previous is not None and downloaded > previous:
+            self._sink.throttle(downloaded - previous)
+
+
+class YTDLogger:
+    """Custom logger for yt-dlp that forwards ``(message, level)`` to a job log"""
+    def __init__(self, callback):
+        self._callback = callback
+    def debug(self, msg):
+        # yt-dlp também envia mensagens informativas por debug()
+        self._callback(msg, "debug" if msg.startswith('[debug] ') else "info")
+    def info(self, msg):
+        self._callback(msg, "info")
+    def warning(self, msg):
+        self._callback(msg, "warning")
+    def error(self, msg):
+        self._callback(msg, "error")
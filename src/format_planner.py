@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Format Planner
+Escolhe os streams (vídeo DASH + áudio, ou progressivo) a partir da lista
+``formats`` já extraída, para a altura e o container pedidos, e explica
+a escolha no log do job.
+"""
+
+from postprocess import ffmpeg_path
+from throughput import format_bytes
+
+# Codecs que entram em cada container por remux (cópia, sem re-encode)
+_VIDEO_CODECS = {
+    "mp4": ("avc1", "avc3", "h264", "hev1", "hvc1", "h265", "av01"),
+    "webm": ("vp8", "vp9", "vp09", "av01"),
+}
+_AUDIO_CODECS = {
+    "mp4": ("mp4a", "aac", "ac-3", "ec-3"),
+    "webm": ("opus", "vorbis"),
+}
+_AUDIO_FORMATS = ("mp3", "wav")
+
+
+# Codec desconhecido (None) conta como presente, como no yt-dlp
+def _has_video(f):
+    return f.get('vcodec') != 'none'
+
+
+def _has_audio(f):
+    return f.get('acodec') != 'none'
+
+
+def _codec_fits(codec, container, table, ext):
+    """Whether a stream can be copied into ``container`` as-is"""
+    if not codec or codec == 'none':
+        return ext == container
+    return codec.lower().split('.')[0] in table.get(container, ())
+
+
+def fits_container(f, container):
+    """Whether every stream of ``f`` can be remuxed into ``container`` without re-encoding"""
+    fits = True
+    if _has_video(f):
+        fits = _codec_fits(f.get('vcodec'), container, _VIDEO_CODECS, f.get('ext'))
+    if fits and _has_audio(f):
+        fits = _codec_fits(f.get('acodec'), container, _AUDIO_CODECS, f.get('ext'))
+    return fits
+
+
+def estimate_size(f, duration=None):
+    """Byte size from the format dict (exact, approximate or bitrate x duration)"""
+    size = f.get('filesize') or f.get('filesize_approx')
+    if size:
+        return int(size)
+    if f.get('tbr') and duration:
+        return int(f['tbr'] * 1000 / 8 * duration)
+    return None
+
+
+def _size_key(size):
+    # Tamanho desconhecido perde para qualquer tamanho conhecido
+    return size if size is not None else float('inf')
+
+
+def _is_hls(f):
+    return 'm3u8' in (f.get('protocol') or '')
+
+
+class FormatPlan:
+    """Streams chosen for one job and why.
+
+    ``selector`` is the yt-dlp format string (explicit format ids with the
+    generic selector as fallback, in case a refreshed extraction changed
+    the ids); :meth:`ydl_opts` returns the options to merge it.
+    """
+
+    def __init__(self, selector, video=None, audio=None, merge_output_format=None,
+                 size=None, notes=None):
+        self.selector = selector
+        self.video = video
+        self.audio = audio
+        self.merge_output_format = merge_output_format
+        self.size = size
+        self.notes = notes or []
+
+    def ydl_opts(self):
+        opts = {'format': self.selector}
+        if self.merge_output_format:
+            opts['merge_output_format'] = self.merge_output_format
+        return opts
+
+    def explain(self):
+        """Log lines describing the choice"""
+        lines = []
+        if self.video is not None:
+            lines.append(f"Format plan: video {describe_format(self.video)}")
+        if self.audio is not None:
+            prefix = "  + audio" if self.video is not None else "Format plan: audio"
+            lines.append(f"{prefix} {describe_format(self.audio)}")
+        lines.extend("  " + note for note in self.notes)
+        if self.size:
+            lines.append(f"  estimated size {format_bytes(self.size)}")
+        return lines
+
+
+def describe_format(f):
+    """``137 1080p avc1.640028 30fps mp4 (~85.3 MB)``"""
+    parts = [str(f.get('format_id'))]
+    if f.get('height'):
+        parts.append(f"{f['height']}p")
+    if f.get('vcodec') and f['vcodec'] != 'none':
+        parts.append(f['vcodec'])
+    if f.get('fps'):
+        parts.append(f"{f['fps']:.0f}fps")
+    if f.get('acodec') and f['acodec'] != 'none':
+        parts.append(f['acodec'])
+    if f.get('abr'):
+        parts.append(f"{f['abr']:.0f}k")
+    parts.append(f.get('ext') or '?')
+    size = estimate_size(f, f.get('_duration'))
+    if size:
+        parts.append(f"(~{format_bytes(size)})")
+    return " ".join(parts)
+
+
+def ffmpeg_available():
+    """Merging separate video/audio streams needs FFmpeg"""
+    return ffmpeg_path() is not None
+
+
+def plan_formats(info, format_type, quality, fallback, can_merge=None):
+    """Plan the download of ``info`` or return None to keep ``fallback``.
+
+    ``fallback`` is the generic selector for the format/quality pair; it is
+    used as is when the info has no ``formats`` list (playlists, some
+    extractors) and appended to every plan.
+    """
+    formats = [dict(f, _duration=info.get('duration')) for f in info.get('formats') or ()
+               if f.get('format_id') and not f.get('has_drm') and f.get('ext') != 'mhtml']
+    if not formats:
+        return None
+    if can_merge is None:
+        can_merge = ffmpeg_available()
+
+    if format_type in _AUDIO_FORMATS:
+        return _plan_audio(formats, fallback)
+    return _plan_video(formats, format_type, quality, fallback, can_merge)
+
+
+def _plan_audio(formats, fallback):
+    audio = _best_audio([f for f in formats if _has_audio(f) and not _has_video(f)], None)
+    if audio is None:
+        return None
+    size = estimate_size(audio, audio['_duration'])
+    return FormatPlan(f"{audio['format_id']}/{fallback}", audio=audio, size=size,
+                      notes=["best audio-only stream (smallest of equal bitrate)"])
+
+
+def _best_audio(candidates, container):
+    """Original language first, then container fit, bitrate, smallest size"""
+    def rank(f):
+        fits = container is None or _codec_fits(f.get('acodec'), container, _AUDIO_CODECS, f.get('ext'))
+        return (-(f.get('language_preference') or 0),
+                not fits,
+                -round(f.get('abr') or f.get('tbr') or 0),
+                _is_hls(f),
+                _size_key(estimate_size(f, f['_duration'])))
+    return min(candidates, key=rank) if candidates else None
+
+
+def _pick_height(candidates, target):
+    """Highest height <= target, or the lowest available above it"""
+    heights = {f['height'] for f in candidates if f.get('height')}
+    if not heights:
+        return None
+    if target is None:
+        return max(heights)
+    below = [h for h in heights if h <= target]
+    return max(below) if below else min(heights)
+
+
+def _best_video(candidates, height, container, fits):
+    """Among streams of ``height``: container fit, fps, direct HTTP, smallest"""
+    same = [f for f in candidates if f.get('height') == height] if height else candidates
+
+    def rank(f):
+        return (not fits(f),
+                -(f.get('fps') or 0),
+                _is_hls(f),
+                _size_key(estimate_size(f, f['_duration'])))
+    ranked = sorted(same, key=rank)
+    best = ranked[0]
+    equivalent = sum(1 for f in ranked if rank(f)[:3] == rank(best)[:3])
+    return best, equivalent
+
+
+def _plan_video(formats, container, quality, fallback, can_merge):
+    target = int(quality[:-1]) if quality.endswith('p') and quality[:-1].isdigit() else None
+    label = f"{container.upper()} {quality}"
+    video_only = [f for f in formats if _has_video(f) and not _has_audio(f)]
+    muxed = [f for f in formats if _has_video(f) and _has_audio(f)]
+    audio_only = [f for f in formats if _has_audio(f) and not _has_video(f)]
+    notes = []
+
+    def video_fits(f):
+        return _codec_fits(f.get('vcodec'), container, _VIDEO_CODECS, f.get('ext'))
+
+    def muxed_fits(f):
+        return f.get('ext') == container
+
+    # Candidato progressivo (um arquivo, sem merge)
+    single = None
+    if muxed:
+        single, _ = _best_video(muxed, _pick_height(muxed, target), container, muxed_fits)
+
+    # Candidato DASH (vídeo + áudio separados, remux pelo FFmpeg)
+    pair = None
+    if video_only and audio_only and can_merge:
+        height = _pick_height(video_only, target)
+        video, equivalent = _best_video(video_only, height, container, video_fits)
+        audio = _best_audio(audio_only, container)
+        pair = (video, audio, equivalent)
+    elif video_only and audio_only:
+        notes.append("FFmpeg not found: separate video/audio streams can't be merged, "
+                     "using a single-file stream")
+
+    if pair is not None:
+        video, audio, equivalent = pair
+        pair_size = _sum_sizes(video, audio)
+        # Progressivo equivalente (mesma altura, container certo) e menor: sem merge
+        if (single is not None and single.get('height') == video.get('height')
+                and muxed_fits(single) and video_fits(video)
+                and _size_key(estimate_size(single, single['_duration'])) <= _size_key(pair_size)):
+            pair = None
+            notes.append("single-file stream is as good as video+audio and not larger")
+
+    if pair is not None:
+        video, audio, equivalent = pair
+        if target and video.get('height') and video['height'] != target:
+            notes.append(f"{target}p not available, closest is {video['height']}p")
+        if equivalent > 1:
+            notes.append(f"smallest of {equivalent} equivalent video streams")
+        merge_into = _merge_container(video, audio, container)
+        if merge_into == container:
+            notes.append(f"merged into .{container} by remux (no re-encode)")
+        else:
+            # Copiar codecs incompatíveis para o container pedido faz o FFmpeg falhar
+            notes.append(f"no {label} streams fit .{container}; merged into .{merge_into} "
+                         f"by remux instead")
+        return FormatPlan(f"{video['format_id']}+{audio['format_id']}/{fallback}",
+                          video=video, audio=audio, merge_output_format=merge_into,
+                          size=pair_size, notes=notes)
+
+    if single is None:
+        return None
+    if target and single.get('height') and single['height'] != target:
+        notes.append(f"{target}p not available as a single file, using {single['height']}p")
+    if not muxed_fits(single):
+        notes.append(f"no single-file .{container} stream, keeping .{single.get('ext')}")
+    return FormatPlan(f"{single['format_id']}/{fallback}", video=single,
+                      size=estimate_size(single, single['_duration']), notes=notes)
+
+
+def _merge_container(video, audio, container):
+    """``container`` if both streams can be copied into it, else mp4/webm, else mkv (takes any codec)"""
+    for candidate in (container,) + tuple(c for c in _VIDEO_CODECS if c != container):
+        if (_codec_fits(video.get('vcodec'), candidate, _VIDEO_CODECS, video.get('ext'))
+                and _codec_fits(audio.get('acodec'), candidate, _AUDIO_CODECS, audio.get('ext'))):
+            return candidate
+    return "mkv"
+
+
+def _sum_sizes(*formats):
+    sizes = [estimate_size(f, f['_duration']) for f in formats]
+    if any(size is None for size in sizes):
+        return None
+    return sum(sizes)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Gradient Background
+Gradiente vertical pré-renderizado como uma única imagem no Canvas,
+com cache por tamanho e regeneração (com throttle) ao redimensionar.
+"""
+
+import tkinter as tk
+from collections import OrderedDict
+
+
+def parse_hex(color):
+    """``'#rrggbb'`` -> ``(r, g, b)``"""
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+def gradient_rows(color1, color2, height):
+    """One ``#rrggbb`` colour per pixel row, from ``color1`` to ``color2``"""
+    r1, g1, b1 = parse_hex(color1)
+    r2, g2, b2 = parse_hex(color2)
+    dr, dg, db = r2 - r1, g2 - g1, b2 - b1
+    rows = []
+    for i in range(height):
+        ratio = i / height
+        rows.append(f"#{int(r1 + dr * ratio):02x}{int(g1 + dg * ratio):02x}{int(b1 + db * ratio):02x}")
+    return rows
+
+
+class GradientBackground:
+    """Vertical gradient drawn as one image item on ``canvas``.
+
+    The image is built with a single ``put`` (one column of row colours,
+    tiled across the width by Tk) and kept in a small per-size cache.
+    ``<Configure>`` events are coalesced: at most one render every
+    ``throttle_ms``, always for the latest size.
+    """
+
+    def __init__(self, canvas, color1, color2, throttle_ms=100, cache_size=4):
+        self.canvas = canvas
+        self.color1 = color1
+        self.color2 = color2
+        self.throttle_ms = throttle_ms
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._item = None
+        self._size = None
+        self._pending_size = None
+        self._after_id = None
+        canvas.bind('<Configure>', self._on_configure, add='+')
+
+    def render(self, width, height):
+        """Show the gradient for ``width`` x ``height`` (no-op if unchanged)"""
+        width, height = max(1, width), max(1, height)
+        if (width, height) == self._size:
+            return
+        image = self._image(width, height)
+        if self._item is None:
+            self._item = self.canvas.create_image(0, 0, anchor='nw', image=image)
+            self.canvas.tag_lower(self._item)
+        else:
+            self.canvas.itemconfigure(self._item, image=image)
+        self._size = (width, height)
+
+    def _image(self, width, height):
+        key = (width, height)
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            return image
+
+        image = tk.PhotoImage(master=self.canvas, width=width, height=height)
+        column = " ".join("{%s}" % color for color in gradient_rows(self.color1, self.color2, height))
+        # Uma coluna de 1 px; o Tk replica até preencher a largura
+        image.put(column, to=(0, 0, width, height))
+
+        self._cache[key] = image
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return image
+
+    def _on_configure(self, event):
+        self._pending_size = (event.width, event.height)
+        if self._after_id is None:
+            self._after_id = self.canvas.after(self.throttle_ms, self._apply_pending)
+
+    def _apply_pending(self):
+        self._after_id = None
+        if self._pending_size is not None:
+            width, height = self._pending_size
+            self._pending_size = None
+            self.render(width, height)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Host Scheduler
+Limite de jobs simultâneos por host (plataforma), classificação de erros
+e backoff exponencial com jitter aplicado ao host inteiro em caso de 429.
+"""
+
+import random
+import re
+import time
+
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+_RATE_LIMIT_PATTERNS = re.compile(
+    r"HTTP Error 429|Too Many Requests|rate[- ]?limit|confirm you.re not a bot|"
+    r"Sign in to confirm|unusual traffic|temporarily blocked",
+    re.IGNORECASE)
+_TRANSIENT_PATTERNS = re.compile(
+    r"HTTP Error 5\d\d|timed? ?out|Connection (reset|refused|aborted)|"
+    r"Remote end closed|IncompleteRead|Temporary failure|Network is unreachable|"
+    r"getaddrinfo failed|Name or service not known|EOF occurred|SSL:",
+    re.IGNORECASE)
+
+
+def classify_error(error):
+    """``RATE_LIMIT``, ``TRANSIENT`` or ``PERMANENT`` for an exception or message"""
+    message = str(error)
+    if _RATE_LIMIT_PATTERNS.search(message):
+        return RATE_LIMIT
+    if _TRANSIENT_PATTERNS.search(message):
+        return TRANSIENT
+    return PERMANENT
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential delay for ``attempt`` (1, 2, ...) with "equal jitter"
+
+    Half of the delay is fixed, the other half random, so hosts backed off
+    together don't all come back at the same instant.
+    """
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class HostScheduler:
+    """Per-host concurrency caps and host-wide backoff.
+
+    Not thread-safe by itself: the engine calls it under its own lock.
+    ``limits`` maps a host key (the platform) to its maximum number of
+    running jobs; hosts not listed are only bound by ``default_limit``
+    (None = no per-host cap). A rate-limit error pauses the whole host for
+    an exponentially growing, jittered delay; a success resets it.
+    Transient errors only delay the job that hit them (:meth:`retry_delay`).
+    """
+
+    def __init__(self, limits=None, default_limit=None, base_backoff=10.0, max_backoff=600.0,
+                 retry_backoff=2.0, max_retry_backoff=60.0):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._active = {}
+        self._blocked_until = {}
+        self._strikes = {}
+
+    def limit(self, host):
+        return self.limits.get(host, self.default_limit)
+
+    def set_limit(self, host, limit):
+        self.limits[host] = limit
+
+    def ready_at(self, host, now=None):
+        """Monotonic time at which ``host`` may start another job, or None if it is at its cap"""
+        now = time.monotonic() if now is None else now
+        limit = self.limit(host)
+        if limit is not None and self._active.get(host, 0) >= limit:
+            return None
+        return max(now, self._blocked_until.get(host, 0.0))
+
+    def started(self, host):
+        self._active[host] = self._active.get(host, 0) + 1
+
+    def finished(self, host):
+        self._active[host] = max(0, self._active.get(host, 0) - 1)
+
+    def succeeded(self, host):
+        self._strikes.pop(host, None)
+
+    def rate_limited(self, host, now=None):
+        """Back the whole host off; returns the pause in seconds"""
+        now = time.monotonic() if now is None else now
+        strikes = self._strikes.get(host, 0) + 1
+        self._strikes[host] = strikes
+        delay = backoff_delay(strikes, self.base_backoff, self.max_backoff)
+        self._blocked_until[host] = max(self._blocked_until.get(host, 0.0), now + delay)
+        return delay
+
+    def retry_delay(self, attempt):
+        """Backoff of a single job after a transient error (the host is not paused)"""
+        return backoff_delay(attempt, self.retry_backoff, self.max_retry_backoff)
+
+    def snapshot(self, now=None):
+        """``{host: {active, limit, paused_for, strikes}}`` for display/metrics"""
+        now = time.monotonic() if now is None else now
+        hosts = set(self._active) | set(self._blocked_until) | set(self.limits)
+        return {host: {'active': self._active.get(host, 0),
+                       'limit': self.limit(host),
+                       'paused_for': max(0.0, self._blocked_until.get(host, 0.0) - now),
+                       'strikes': self._strikes.get(host, 0)}
+                for host in sorted(hosts)}
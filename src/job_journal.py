@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Job Journal
+Journal append-only (JSON Lines) das transições de estado dos jobs, para
+reconstruir a fila depois de fechar o app ou de um crash.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from app_paths import data_file
+
+# Estados finais (mesmos valores de download_engine.JobState.FINAL)
+_FINAL_STATES = ("completed", "failed", "cancelled")
+
+
+def journal_key(job):
+    """One entry per video/format/quality/folder, like the engine's dedupe"""
+    return f"{job.key}|{job.format_type}|{job.quality}|{job.download_path}"
+
+
+class JobJournal:
+    """Append-only record of submissions and state changes.
+
+    Each line is ``{"ts", "key", "event": "submit"|"state", ...}``; the last
+    line of a key wins. A torn last line (crash mid-write) is ignored. On
+    open the file is compacted to the submissions that never reached a
+    final state, which :meth:`resume` hands back to the engine.
+
+    Every record is flushed to the OS right away (enough to survive an app
+    crash). Final states are fsynced immediately; everything else (bulk
+    imports add thousands of submissions) is group-committed by one fsync
+    at most ``sync_interval`` seconds later.
+
+    Only one process may own a journal: an exclusive lock on
+    ``path + ".lock"`` is held until :meth:`close`, and opening a journal
+    that another process holds raises OSError.
+    """
+
+    def __init__(self, path=None, sync_interval=1.0):
+        self.path = path or data_file("jobs.journal")
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._owner = _acquire_lock(self.path + ".lock")
+        try:
+            self.pending = self._compact(self._replay())
+            self._file = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            self._owner.close()
+            raise
+
+    def _replay(self):
+        """Latest submit record of every unfinished key, in submission order"""
+        entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    key = record.get("key")
+                    if record.get("event") == "submit":
+                        entries.pop(key, None)
+                        entries[key] = record
+                    elif record.get("event") == "state" and key in entries:
+                        if record.get("state") in _FINAL_STATES:
+                            del entries[key]
+                        else:
+                            entries[key]["last_state"] = record.get("state")
+        except FileNotFoundError:
+            pass
+        return list(entries.values())
+
+    def _compact(self, pending):
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            for record in pending:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        return pending
+
+    def attach(self, engine):
+        """Start recording the engine's events"""
+        engine.add_listener(self.on_event)
+
+    def resume(self, engine):
+        """Resubmit the jobs left unfinished by the last session"""
+        pending, self.pending = self.pending, []
+        jobs = []
+        for record in pending:
+            try:
+                jobs.append(engine.submit(record["url"], record["format"], record["quality"],
+                                          record["path"]))
+            except (KeyError, ValueError, RuntimeError) as e:
+                print(f"Journal entry skipped: {e}", file=sys.stderr)
+        return jobs
+
+    def on_event(self, event, job, payload):
+        if event == "added":
+            self._write({"event": "submit", "key": journal_key(job), "url": job.url,
+                         "format": job.format_type, "quality": job.quality,
+                         "path": job.download_path})
+        elif event == "state":
+            self._write({"event": "state", "key": journal_key(job), "state": payload},
+                        sync=payload in _FINAL_STATES)
+
+    def _write(self, record, sync=False):
+        record["ts"] = round(time.time(), 3)
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+            elif not self._dirty:
+                # Um fsync para todo o grupo de registros que chegar até lá
+                self._dirty = True
+                timer = threading.Timer(self.sync_interval, self._sync)
+                timer.daemon = True
+                timer.start()
+
+    def _sync(self):
+        with self._lock:
+            if self._file is not None and self._dirty:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def close(self):
+        """Stop recording (events after this are not journaled)"""
+        with self._lock:
+            if self._file is not None:
+                if self._dirty:
+                    os.fsync(self._file.fileno())
+                    self._dirty = False
+                self._file.close()
+                self._file = None
+                self._owner.close()  # libera o lock
+
+
+def _acquire_lock(path):
+    """Open ``path`` and lock it exclusively without blocking (OSError if taken)"""
+    f = open(path, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        raise OSError(f"{path} is locked by another MediaSlayer process")
+    return f
+
+
+def open_default_journal(name="jobs.journal"):
+    """Open a journal in the data directory, or None if unavailable.
+
+    Each mode has its own file (the GUI ``jobs.journal``, the daemon
+    ``daemon.journal``) so they never compact or resume each other's jobs.
+    """
+    try:
+        return JobJournal(data_file(name))
+    except OSError as e:
+        print(f"Job journal disabled: {e}", file=sys.stderr)
+        return None
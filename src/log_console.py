@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Log Console
+Modelo de log em ring buffer com filtro por nível e inserção em lote
+no ScrolledText (uma vez por tick da UI).
+"""
+
+import tkinter as tk
+from collections import Counter, deque
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+_PREFIXES = {"warning": "WARNING: ", "error": "ERROR: "}
+
+
+def format_line(level, message):
+    """Render a record as a console line (prefix for warnings/errors)"""
+    prefix = _PREFIXES.get(level, "")
+    if prefix and not message.startswith(prefix):
+        return prefix + message
+    return message
+
+
+class LogBuffer:
+    """Bounded log model.
+
+    Records below ``min_level`` are only counted. The rest are kept in a
+    ring of ``max_lines`` entries, and the lines not yet rendered wait in a
+    second ring of the same size, so a burst never grows memory.
+    """
+
+    def __init__(self, max_lines=1000, min_level="info"):
+        self.max_lines = max_lines
+        self.min_level = min_level
+        self.counts = Counter()
+        self.hidden = 0
+        self.lines = deque(maxlen=max_lines)
+        self._pending = deque(maxlen=max_lines)
+        self._needs_rerender = False
+
+    def append(self, level, message):
+        self.counts[level] += 1
+        if LEVELS.get(level, 20) < LEVELS[self.min_level]:
+            self.hidden += 1
+            return
+        line = format_line(level, message)
+        self.lines.append((level, line))
+        self._pending.append(line)
+
+    def set_min_level(self, level):
+        """Change the filter; lines already stored below it are dropped from view"""
+        self.min_level = level
+        threshold = LEVELS[level]
+        kept = [record for record in self.lines if LEVELS.get(record[0], 20) >= threshold]
+        self.lines = deque(kept, maxlen=self.max_lines)
+        self._pending.clear()
+        self._needs_rerender = True
+
+    def take_pending(self):
+        """Lines added since the last call and whether a full redraw is needed"""
+        rerender, self._needs_rerender = self._needs_rerender, False
+        lines = [line for _, line in self.lines] if rerender else list(self._pending)
+        self._pending.clear()
+        return lines, rerender
+
+
+class LogConsole:
+    """Renders a :class:`LogBuffer` into a ScrolledText in batches.
+
+    Call :meth:`flush` from the UI tick: all pending lines are inserted with
+    a single ``insert`` and the widget is trimmed to ``max_lines``.
+    """
+
+    def __init__(self, text_widget, buffer):
+        self.text = text_widget
+        self.buffer = buffer
+
+    def flush(self):
+        lines, rerender = self.buffer.take_pending()
+        if not lines and not rerender:
+            return
+
+        # Só rola para o fim se o usuário já estava no fim
+        follow = self.text.yview()[1] >= 0.999
+        self.text.configure(state='normal')
+        if rerender:
+            self.text.delete('1.0', tk.END)
+        if lines:
+            self.text.insert(tk.END, "\n".join(lines) + "\n")
+
+        line_count = int(self.text.index('end-1c').split('.')[0]) - 1
+        excess = line_count - self.buffer.max_lines
+        if excess > 0:
+            self.text.delete('1.0', f'{excess + 1}.0')
+        self.text.configure(state='disabled')
+        if follow:
+            self.text.yview(tk.END)
+
+    def clear(self):
+        self.buffer.lines.clear()
+        self.buffer.take_pending()
+        self.text.configure(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.configure(state='disabled')
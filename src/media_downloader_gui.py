@@ -6,21 +6,53 @@ MediaSlayer - Interface o mais próxima possível do design React
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import threading
-import yt_dlp
 import os
-import re
-import signal
-import time
+
+from download_engine import DownloadEngine, JobState
+from metadata_cache import open_default_cache
+from job_journal import open_default_journal
+from url_analyzer import AnalysisWorker, Debouncer
+from url_normalizer import dedupe_key, detect_platform, is_collection_url
+from ui_bridge import UIBridge
+from throughput import format_bytes, format_eta
+from bandwidth import parse_rate
+from concurrency import AIMDController
+from app_paths import data_file
+from bulk_import import BulkImporter
+from log_console import LogBuffer, LogConsole
+from startup_profile import PROFILE
+from gradient import GradientBackground
+from single_instance import InstanceServer
 
 class MediaSlayerGUI:
     def __init__(self, root):
         self.root = root
-        self.setup_window()
-        self.setup_variables()
-        self.setup_styles()
-        self.create_ui()
-        
+        with PROFILE.measure("setup_window"):
+            self.setup_window()
+        with PROFILE.measure("setup_variables"):
+            self.setup_variables()
+        with PROFILE.measure("setup_styles"):
+            self.setup_styles()
+        with PROFILE.measure("create_ui"):
+            self.create_ui()
+        self.bridge.start()
+        # yt-dlp / workers só depois que a janela estiver na tela
+        self.root.after_idle(self.on_first_paint)
+
+    def on_first_paint(self):
+        """Janela desenhada: aquecer yt-dlp e workers em segundo plano"""
+        PROFILE.mark("first_paint")
+        self.root.after(200, self.engine.warm_up)
+        self.root.after(300, self.resume_journal)
+
+    def resume_journal(self):
+        """Resubmeter os jobs que ficaram pendentes na última sessão"""
+        if self.journal is None or not self.journal.pending:
+            return
+        jobs = self.journal.resume(self.engine)
+        if jobs:
+            self.add_log(f"Resuming {len(jobs)} unfinished quest(s) from the last session...")
+
     def setup_window(self):
         """Configurar janela principal"""
         self.root.title("MediaSlayer")
@@ -50,16 +82,47 @@ class MediaSlayerGUI:
         self.url_var = tk.StringVar()
         self.format_var = tk.StringVar(value="mp4")
         self.quality_var = tk.StringVar(value="720p")
+        self.limit_var = tk.StringVar(value="♾️ Unlimited")
         self.progress_var = tk.DoubleVar()
         self.status_var = tk.StringVar(value="")
         
         self.download_path = os.path.join(os.getcwd(), "downloads")
-        self.last_analyzed_url = ""
+        self.last_analyzed_key = ""
+        # (chave canônica, info) da última análise: reaproveitado pelo download
         self.video_info = None
-        self.is_downloading = False
         self.platform = None
-        self.cancel_requested = False
-        self.logger = None
+        # Importações em andamento (arquivo, área de transferência, playlist)
+        self.importers = []
+
+        # Canal único engine -> UI, drenado pelo main loop
+        self.bridge = UIBridge(self.root)
+        self.bridge.add_tick_callback(self.flush_job_rows)
+        self.dirty_jobs = set()
+        self.job_progress = {}
+        self.log_buffer = LogBuffer(max_lines=1000, min_level="info")
+
+        # Engine de downloads: a GUI apenas observa os eventos
+        # Jobs em processos separados: o yt-dlp não disputa o GIL com o Tk
+        # Arquivos progressivos em 4 conexões (CDNs limitam a vazão por conexão)
+        self.engine = DownloadEngine(max_workers=3, cache=open_default_cache(), executor="process",
+                                     connections_per_download=4,
+                                     host_limits={"youtube": 3, "twitter": 3},
+                                     # Nº de jobs paralelos ajustado pela vazão medida
+                                     concurrency=AIMDController(initial=3, maximum=6))
+        self.engine.add_listener(self.on_engine_event)
+        # Journal: fila reconstruída na próxima abertura (após fechar ou crash)
+        self.journal = open_default_journal()
+        if self.journal is not None:
+            self.journal.attach(self.engine)
+
+        # Lançamentos seguintes repassam suas URLs para esta janela
+        self.instance = InstanceServer(
+            lambda command, urls: self.bridge.post(self.on_remote_launch, urls))
+        self.instance.start()
+
+        # Análise automática: um único worker, disparado com debounce
+        self.analyzer = AnalysisWorker(self.engine.extract_info, self.on_analysis_result)
+        self.analysis_debouncer = Debouncer(self.root, 1000, self.analyze_url_automatically)
     
     def setup_styles(self):
         """Configurar estilos para combinar com o React"""
@@ -157,25 +220,25 @@ class MediaSlayerGUI:
                            background=colors['red_600'],
                            troughcolor=colors['slate_700'],
                            borderwidth=0)
+
+        # Lista de jobs
+        self.style.configure('Jobs.Treeview',
+                           background=colors['slate_700'],
+                           fieldbackground=colors['slate_700'],
+                           foreground=colors['gray_300'],
+                           borderwidth=0,
+                           font=('Segoe UI', 9))
+        self.style.configure('Jobs.Treeview.Heading',
+                           background=colors['slate_800'],
+                           foreground=colors['white'],
+                           font=('Segoe UI', 9, 'bold'))
     
     def create_gradient_frame(self, parent, color1, color2, width, height):
-        """Simular gradiente com Canvas"""
+        """Gradiente vertical como uma única imagem no Canvas"""
         canvas = tk.Canvas(parent, width=width, height=height, highlightthickness=0)
-        
-        # Criar gradiente vertical
-        for i in range(height):
-            ratio = i / height
-            # Interpolação simples entre as cores
-            r1, g1, b1 = int(color1[1:3], 16), int(color1[3:5], 16), int(color1[5:7], 16)
-            r2, g2, b2 = int(color2[1:3], 16), int(color2[3:5], 16), int(color2[5:7], 16)
-            
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-            
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            canvas.create_line(0, i, width, i, fill=color)
-        
+        # Regenerado (com cache por tamanho) quando a janela é redimensionada
+        self.gradient = GradientBackground(canvas, color1, color2)
+        self.gradient.render(width, height)
         return canvas
     
     def create_ui(self):
@@ -185,9 +248,10 @@ class MediaSlayerGUI:
         main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Simular gradiente de fundo usando as dimensões calculadas da janela
-        gradient_canvas = self.create_gradient_frame(
-            main_frame, '#0f172a', '#1e293b', self.window_width, self.window_height
-        )
+        with PROFILE.measure("gradient"):
+            gradient_canvas = self.create_gradient_frame(
+                main_frame, '#0f172a', '#1e293b', self.window_width, self.window_height
+            )
         gradient_canvas.place(x=0, y=0, relwidth=1, relheight=1)
         
         # Container centralizado
@@ -223,6 +287,16 @@ class MediaSlayerGUI:
         
         url_label = ttk.Label(url_label_frame, text="⚡ Target URL", style='FieldLabel.TLabel')
         url_label.pack(side=tk.LEFT)
+
+        # Importação em lote: vários links de uma vez
+        import_btn = ttk.Button(url_label_frame, text="📥 Import List", command=self.import_url_file,
+                                style='RedGradient.TButton')
+        import_btn.pack(side=tk.RIGHT)
+        paste_btn = ttk.Button(url_label_frame, text="📋 Paste List", command=self.paste_url_list,
+                               style='RedGradient.TButton')
+        paste_btn.pack(side=tk.RIGHT, padx=(0, 8))
+        self.import_status = ttk.Label(url_label_frame, text="", style='CardDesc.TLabel')
+        self.import_status.pack(side=tk.RIGHT, padx=(0, 8))
         
         # Container para input com ícone
         url_input_frame = ttk.Frame(url_section, style='Card.TFrame')
@@ -250,6 +324,7 @@ class MediaSlayerGUI:
         dropdowns_frame.pack(fill=tk.X, pady=(0, 18))  # Reduzido de 25 para 18
         dropdowns_frame.columnconfigure(0, weight=1)
         dropdowns_frame.columnconfigure(1, weight=1)
+        dropdowns_frame.columnconfigure(2, weight=1)
         
         # Format Enchantment
         format_frame = ttk.Frame(dropdowns_frame, style='Card.TFrame')
@@ -278,6 +353,21 @@ class MediaSlayerGUI:
                                          state="readonly", style='Modern.TCombobox')
         self.quality_combo.pack(fill=tk.X, ipady=6)  # Reduzido de 8 para 6
         self.quality_combo.set("⭐ 720p (Epic)")
+
+        # Limite de banda global (vale para os jobs em andamento)
+        limit_frame = ttk.Frame(dropdowns_frame, style='Card.TFrame')
+        limit_frame.grid(row=0, column=2, sticky=(tk.W, tk.E), padx=(12, 0))
+
+        limit_label = ttk.Label(limit_frame, text="🌊 Mana Flow", style='FieldLabel.TLabel')
+        limit_label.pack(anchor=tk.W, pady=(0, 8))
+
+        self.limit_combo = ttk.Combobox(limit_frame, textvariable=self.limit_var,
+                                        values=["♾️ Unlimited", "1 MB/s", "2 MB/s", "5 MB/s",
+                                                "10 MB/s", "25 MB/s"],
+                                        state="readonly", style='Modern.TCombobox')
+        self.limit_combo.pack(fill=tk.X, ipady=6)
+        self.limit_combo.set("♾️ Unlimited")
+        self.limit_combo.bind('<<ComboboxSelected>>', self.on_speed_limit_change)
         
         # Progress Bar (inicialmente oculta)
         self.progress_frame = ttk.Frame(card_content, style='Card.TFrame')
@@ -293,13 +383,36 @@ class MediaSlayerGUI:
         self.progress_bar = ttk.Progressbar(self.progress_frame, variable=self.progress_var,
                                            maximum=100, style='Modern.Horizontal.TProgressbar')
         self.progress_bar.pack(fill=tk.X, pady=(10, 0), ipady=2)
-        
-        # NEW: Scrolling text area for logs
-        self.log_text = scrolledtext.ScrolledText(card_content, width=80, height=8,
+
+        # Fila de jobs (cada URL submetida vira uma linha)
+        self.jobs_tree = ttk.Treeview(card_content, columns=("id", "platform", "target", "state", "progress", "speed"),
+                                      show='headings', height=4, style='Jobs.Treeview')
+        for column, title, width in (("id", "#", 30), ("platform", "Realm", 70), ("target", "Target", 240),
+                                     ("state", "State", 90), ("progress", "%", 45), ("speed", "Speed / ETA", 120)):
+            self.jobs_tree.heading(column, text=title)
+            self.jobs_tree.column(column, width=width, stretch=(column == "target"))
+        self.jobs_tree.pack(fill=tk.X)
+        self.jobs_tree.bind('<Double-1>', self.retry_selected_job)
+
+        # Cabeçalho do log com filtro de nível
+        log_header = ttk.Frame(card_content, style='Card.TFrame')
+        log_header.pack(fill=tk.X, pady=(10, 4))
+        ttk.Label(log_header, text="📜 Quest Log", style='FieldLabel.TLabel').pack(side=tk.LEFT)
+        self.log_level_combo = ttk.Combobox(log_header, values=["error", "warning", "info", "debug"],
+                                            state="readonly", width=8, style='Modern.TCombobox')
+        self.log_level_combo.set(self.log_buffer.min_level)
+        self.log_level_combo.bind('<<ComboboxSelected>>', self.on_log_level_change)
+        self.log_level_combo.pack(side=tk.RIGHT)
+        self.log_hidden_label = ttk.Label(log_header, text="", style='CardDesc.TLabel')
+        self.log_hidden_label.pack(side=tk.RIGHT, padx=(0, 8))
+
+        # Scrolling text area for logs (ring buffer, inserção em lote por tick)
+        self.log_text = scrolledtext.ScrolledText(card_content, width=80, height=6,
                                                   background='#1e293b', foreground='#d1d5db',
                                                   font=('Consolas', 9), state='disabled', wrap='word',
                                                   borderwidth=1, relief='solid')
-        self.log_text.pack(fill=tk.BOTH, pady=(10, 0))
+        self.log_text.pack(fill=tk.BOTH)
+        self.log_console = LogConsole(self.log_text, self.log_buffer)
         
         # Container para botões
         button_frame = ttk.Frame(card_content, style='Card.TFrame')
@@ -310,7 +423,7 @@ class MediaSlayerGUI:
                                       command=self.start_download, style='RedGradient.TButton')
         self.download_btn.pack(fill=tk.X, ipady=6)
         
-        # Botão de cancelar (inicialmente oculto)
+        # Botão de cancelar (visível enquanto houver jobs ativos)
         self.cancel_btn = ttk.Button(button_frame, text="❌ Cancel Quest", 
                                     command=self.cancel_download, style='RedGradient.TButton')
         self.cancel_btn.pack_forget()
@@ -350,11 +463,7 @@ class MediaSlayerGUI:
         """Detectar plataforma"""
         if not url or url == "https://youtube.com/watch?v=... or https://x.com/...":
             return None
-        if re.search(r'(youtube\.com|youtu\.be)', url):
-            return "youtube"
-        elif re.search(r'(twitter\.com|x\.com|t\.co)', url):
-            return "twitter"
-        return None
+        return detect_platform(url)
     
     def on_url_change(self, event=None):
         """Callback quando URL muda"""
@@ -364,254 +473,256 @@ class MediaSlayerGUI:
         if platform:
             # Mostrar badge da plataforma
             self.platform_frame.pack(pady=(10, 0))
-            if platform == "youtube":
+            if is_collection_url(url):
+                self.platform_label.config(text="📜 YouTube playlist / channel detected", background='#dc2626')
+            elif platform == "youtube":
                 self.platform_label.config(text="⚔️ YouTube realm detected", background='#dc2626')
             else:
                 self.platform_label.config(text="⚔️ X (Twitter) realm detected", background='#2563eb')
             self.platform_label.pack()
             self.platform = platform
             
-            # Analisar automaticamente
-            if url != self.last_analyzed_url:
-                self.root.after(1000, lambda: self.analyze_url_automatically(url))
+            # Analisar automaticamente (debounce: só a última digitação conta);
+            # playlists não: são expandidas só no download, página por página
+            if is_collection_url(url):
+                self.analysis_debouncer.cancel()
+            elif dedupe_key(url) != self.last_analyzed_key:
+                self.analysis_debouncer.trigger(url)
         else:
             self.platform_frame.pack_forget()
             self.platform = None
+            self.analysis_debouncer.cancel()
+            self.analyzer.cancel()
     
     def analyze_url_automatically(self, url):
         """Analisar URL automaticamente"""
-        if not url or url == self.last_analyzed_url or url == "https://youtube.com/watch?v=... or https://x.com/...":
+        if not url or dedupe_key(url) == self.last_analyzed_key or url == "https://youtube.com/watch?v=... or https://x.com/...":
             return
             
-        self.last_analyzed_url = url
         platform = self.detect_platform(url)
-        
         if not platform:
             return
-        
-        def analyze():
-            try:
-                with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    self.video_info = info
-                    
-            except Exception as e:
-                pass
-        
-        threading.Thread(target=analyze, daemon=True).start()
+
+        self.last_analyzed_key = dedupe_key(url)
+        self.analyzer.request(url)
+
+    def on_analysis_result(self, result):
+        """Resultado do worker de análise (worker thread -> main thread)"""
+        self.bridge.post(self.apply_analysis_result, result)
+
+    def apply_analysis_result(self, result):
+        """Guardar análise apenas se ainda corresponder à URL digitada"""
+        key = dedupe_key(result.url)
+        if key != dedupe_key(self.url_var.get()):
+            return
+        if result.ok:
+            self.video_info = (key, result.info)
+        elif self.last_analyzed_key == key:
+            # Permitir nova tentativa na próxima edição
+            self.last_analyzed_key = ""
     
-    def get_format_options(self):
-        """Obter opções de formato"""
+    def get_download_options(self):
+        """Obter formato e qualidade selecionados"""
         format_text = self.format_var.get()
         quality_text = self.quality_var.get()
-        
-        if "MP4" in format_text:
-            format_type = "mp4"
-        elif "MP3" in format_text:
-            return "bestaudio/best"
-        elif "WebM" in format_text:
-            format_type = "webm"
-        elif "WAV" in format_text:
-            return "bestaudio[ext=wav]/bestaudio"
-        else:
-            format_type = "mp4"
-        
-        if "1080p" in quality_text:
-            return f"best[height<=1080]"
-        elif "720p" in quality_text:
-            return f"best[height<=720]"
-        elif "480p" in quality_text:
-            return f"best[height<=480]"
-        elif "360p" in quality_text:
-            return f"best[height<=360]"
-        else:
-            return "best"
-    
-    def update_progress(self, percent, finished=False):
-        """Update progress bar in main thread"""
-        def _update():
-            self.progress_var.set(percent)
-            self.progress_percent.config(text=f"{percent:.0f}%")
-            if finished:
-                self.progress_status.config(text="Quest completed! Media successfully captured!")
-        self.root.after(0, _update)
-    
-    def progress_hook(self, d):
-        """Hook de progresso (thread-safe)"""
-        if d['status'] == 'downloading':
-            percent = None
-            if 'total_bytes' in d and d['total_bytes']:
-                percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
-            elif '_percent_str' in d:
-                try:
-                    percent_str = d['_percent_str'].strip('%')
-                    percent = float(percent_str)
-                except:
-                    pass
-            if percent is not None:
-                self.update_progress(percent)
-        elif d['status'] == 'finished':
-            self.update_progress(100, finished=True)
-    
-    def download_media(self):
-        """Baixar mídia"""
+
+        format_type = "mp4"
+        for name in ("MP4", "MP3", "WebM", "WAV"):
+            if name in format_text:
+                format_type = name.lower()
+                break
+
+        quality = "best"
+        for name in ("1080p", "720p", "480p", "360p"):
+            if name in quality_text:
+                quality = name
+                break
+
+        return format_type, quality
+
+    def start_download(self):
+        """Submeter URL para a fila de downloads"""
         url = self.url_var.get().strip()
         if not url or url == "https://youtube.com/watch?v=... or https://x.com/...":
             messagebox.showerror("Error", "Please enter a valid URL")
             return
-        
-        platform = self.detect_platform(url)
-        if not platform:
+
+        if not self.detect_platform(url):
             messagebox.showerror("Error", "Invalid URL! Please use a YouTube or X (Twitter) URL")
             return
-        
+
+        if is_collection_url(url):
+            from playlist_expander import expand_playlist
+            self.start_bulk_import(expand_playlist, url)
+            return
+
         # Update download path from UI
         self.download_path = self.download_path_var.get() or self.download_path
-        os.makedirs(self.download_path, exist_ok=True)
-        
-        # Mostrar progresso
-        self.progress_frame.pack(fill=tk.X, pady=(0, 25))
-        
-        ydl_opts = {
-            'outtmpl': os.path.join(self.download_path, '%(uploader)s - %(title)s.%(ext)s'),
-            'format': self.get_format_options(),
-            'progress_hooks': [self.progress_hook],
-            'quiet': False,  # Enable verbose output for debugging
-            'no_warnings': False,  # Show warnings for debugging
-            'socket_timeout': 30,  # Add timeout to prevent hanging
-            'retries': 3,  # Retry failed downloads
-            'logger': self.logger if self.logger else None  # NEW
-        }
-        
-        # Add Twitter/X specific options
-        if platform == "twitter":
-            ydl_opts.update({
-                'extractor_args': {
-                    'twitter': {
-                        'api': ['syndication', 'legacy', 'graphql']  # Try multiple APIs
-                    }
-                }
-            })
-        
+        format_type, quality = self.get_download_options()
+        # Reaproveitar a análise automática em vez de extrair novamente
+        analysed = self.video_info
+        info = analysed[1] if analysed and analysed[0] == dedupe_key(url) else None
+        self.engine.submit(url, format_type, quality, self.download_path, info=info)
+
+    def import_url_file(self):
+        """Enfileirar todos os links de um arquivo .txt/.csv/.jsonl"""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(filetypes=[("URL lists", "*.txt *.csv *.jsonl"),
+                                                     ("All files", "*.*")])
+        if path:
+            self.start_bulk_import(BulkImporter.from_file, path)
+
+    def paste_url_list(self):
+        """Enfileirar todos os links da área de transferência"""
         try:
-            if self.cancel_requested:
-                return
-                
-            self.progress_status.config(text="Casting download spell...")
-            self.root.update()  # Force UI update
-            self.add_log("Starting analysis of target URL...")  # NEW
-            
-            if self.cancel_requested:
-                return
-            
-            # First, try to extract info to validate URL
-            self.progress_status.config(text="Analyzing target...")
-            self.root.update()
-            
-            with yt_dlp.YoutubeDL({**ydl_opts, 'quiet': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if not info:
-                    raise Exception("Could not extract video information")
-            
-            if self.cancel_requested:
-                return
-            
-            # If info extraction succeeds, proceed with download
-            self.progress_status.config(text="Casting download spell...")
-            self.root.update()
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            
-            if not self.cancel_requested:
-                messagebox.showinfo("Success", "✅ Quest completed! Media successfully captured and added to your inventory!")
-                self.add_log("Download completed successfully!")  # NEW
-            
-        except Exception as e:
-            error_msg = f"❌ Quest failed! The download spell was interrupted: {str(e)}"
-            print(f"Download error: {e}")  # Print to console for debugging
-            self.add_log(f"ERROR: {e}")  # NEW
-            messagebox.showerror("Error", error_msg)
-        finally:
-            self.progress_var.set(0)
-            self.download_btn.config(state='normal', text="⚔️ Execute Download Quest")
-            self.is_downloading = False
-            self.root.after(3000, lambda: self.progress_frame.pack_forget())
-    
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            messagebox.showerror("Error", "The clipboard has no text to import")
+            return
+        self.start_bulk_import(BulkImporter.from_text, text)
+
+    def start_bulk_import(self, factory, source):
+        """Importar em segundo plano; o progresso chega pelo bridge"""
+        self.importers = [importer for importer in self.importers if importer.running]
+        self.download_path = self.download_path_var.get() or self.download_path
+        format_type, quality = self.get_download_options()
+        importer = factory(self.engine, source, format_type, quality, self.download_path,
+                           on_progress=lambda progress: self.bridge.post(self.on_import_progress, progress))
+        self.importers.append(importer.start())
+
+    def on_import_progress(self, progress):
+        """Atualizar o contador da importação (main thread)"""
+        self.import_status.config(text=f"📥 {progress}")
+        if progress.done:
+            self.add_log(f"Import finished: {progress}")
+            if progress.error is not None:
+                self.add_log(f"Import stopped: {progress.error}", "error")
+
+    def queue_urls(self, urls):
+        """Enfileirar URLs vindas da linha de comando ou de outro lançamento"""
+        self.download_path = self.download_path_var.get() or self.download_path
+        format_type, quality = self.get_download_options()
+        for url in urls:
+            if is_collection_url(url):
+                from playlist_expander import expand_playlist
+                self.start_bulk_import(expand_playlist, url)
+            elif self.detect_platform(url):
+                self.engine.submit(url, format_type, quality, self.download_path)
+            else:
+                self.add_log(f"Ignored unsupported URL: {url}", "warning")
+
+    def on_remote_launch(self, urls):
+        """Outro lançamento do app: trazer a janela para frente e enfileirar as URLs"""
+        self.root.deiconify()
+        self.root.lift()
+        self.root.attributes('-topmost', True)
+        self.root.after(100, lambda: self.root.attributes('-topmost', False))
+        self.root.focus_force()
+        if urls:
+            self.add_log(f"Received {len(urls)} URL(s) from another launch")
+            self.queue_urls(urls)
+
     def cancel_download(self):
-        """Cancel ongoing download"""
-        self.cancel_requested = True
-        self.progress_status.config(text="Cancelling quest...")
-        
-    def download_with_timeout(self):
-        """Download with timeout mechanism"""
-        self.download_result = None
-        self.download_error = None
-        self.cancel_requested = False
-        
-        def download_worker():
-            try:
-                self.download_media()
-                self.download_result = "success"
-            except Exception as e:
-                self.download_error = str(e)
-        
-        # Start download in separate thread
-        download_thread = threading.Thread(target=download_worker, daemon=True)
-        download_thread.start()
-        
-        # Monitor progress with timeout (5 minutes)
-        timeout = 300  # 5 minutes
-        start_time = time.time()
-        
-        while download_thread.is_alive():
-            if self.cancel_requested:
-                # User cancelled
-                self.progress_status.config(text="Quest cancelled by user!")
-                break
-            elif time.time() - start_time > timeout:
-                # Timeout reached
-                self.progress_status.config(text="Download timeout - Quest abandoned!")
-                messagebox.showerror("Timeout", "❌ Download timed out after 5 minutes. The spell may have been blocked by the realm's defenses.")
-                break
-            
-            # Update UI and wait
-            self.root.update()
-            time.sleep(0.1)
-        
-        # Reset UI state
-        self.progress_var.set(0)
-        self.download_btn.config(state='normal', text="⚔️ Execute Download Quest")
-        self.download_btn.pack(fill=tk.X, ipady=6)
-        self.cancel_btn.pack_forget()
-        self.is_downloading = False
-        self.root.after(3000, lambda: self.progress_frame.pack_forget())
+        """Cancel selected job (or the most recent active one)"""
+        selected = [int(item) for item in self.jobs_tree.selection()]
+        if not selected:
+            active = [job.id for job in self.engine.jobs() if not job.is_finished]
+            selected = active[-1:]
+        for job_id in selected:
+            self.engine.cancel(job_id)
 
-    def start_download(self):
-        """Iniciar download"""
-        if self.is_downloading:
+    def retry_selected_job(self, event=None):
+        """Reenviar jobs finalizados (falha/cancelado) selecionados"""
+        for item in self.jobs_tree.selection():
+            job = self.engine.get_job(int(item))
+            if job and job.state in (JobState.FAILED, JobState.CANCELLED):
+                self.engine.retry(job.id)
+
+    def on_engine_event(self, event, job, payload):
+        """Listener do engine (worker threads) -> main thread"""
+        self.bridge.post(self.apply_engine_event, event, job, payload)
+
+    def apply_engine_event(self, event, job, payload):
+        """Refletir eventos do engine na interface (main thread)"""
+        if event == "log":
+            level, message = payload
+            self.add_log(f"[#{job.id}] {message}", level)
+        elif event == "concurrency":
+            self.on_concurrency_decision(payload)
+        elif event == "added":
+            self.jobs_tree.insert('', tk.END, iid=str(job.id),
+                                  values=(job.id, job.platform, job.url, job.state, "0%", ""))
+        else:
+            if event == "progress":
+                self.job_progress[job.id] = payload
+            # Linhas são redesenhadas uma vez por tick, não por evento
+            self.dirty_jobs.add(job.id)
+
+    def flush_job_rows(self):
+        """Tick do bridge: atualizar linhas alteradas e o progresso agregado"""
+        for job_id in self.dirty_jobs:
+            job = self.engine.get_job(job_id)
+            if job and self.jobs_tree.exists(str(job_id)):
+                label = job.title or job.url
+                speed = ""
+                progress = self.job_progress.get(job_id)
+                if progress and job.state == JobState.DOWNLOADING and progress['smoothed_speed']:
+                    speed = f"{format_bytes(progress['smoothed_speed'])}/s  {format_eta(progress['eta'])}"
+                self.jobs_tree.item(str(job_id), values=(job.id, job.platform, label,
+                                                         job.state, f"{job.percent:.0f}%", speed))
+        self.dirty_jobs.clear()
+        self.refresh_overall_progress()
+        self.log_console.flush()
+        if self.log_buffer.hidden:
+            self.log_hidden_label.config(text=f"{self.log_buffer.hidden} hidden")
+
+    def refresh_overall_progress(self):
+        """Atualizar barra de progresso agregada dos jobs ativos"""
+        active = [job for job in self.engine.jobs() if not job.is_finished]
+        if not active:
+            self.progress_var.set(0)
+            self.progress_percent.config(text="0%")
+            self.progress_status.config(text="Quest completed! Media successfully captured!")
+            self.cancel_btn.pack_forget()
             return
-            
-        self.is_downloading = True
-        self.download_btn.config(state='disabled', text="🔄 Casting Spell...")
-        self.download_btn.pack_forget()
-        self.cancel_btn.pack(fill=tk.X, ipady=6)
-        # NEW: reset log and initialize logger
-        self.log_text.configure(state='normal')
-        self.log_text.delete('1.0', tk.END)
-        self.log_text.configure(state='disabled')
-        self.logger = self.YTDLogger(self.add_log)
-        threading.Thread(target=self.download_with_timeout, daemon=True).start()
-
-    def add_log(self, message):
-        """Thread-safe append to log box"""
-        def _append():
-            self.log_text.configure(state='normal')
-            self.log_text.insert(tk.END, message + "\n")
-            self.log_text.yview(tk.END)
-            self.log_text.configure(state='disabled')
-
-        self.root.after(0, _append)
+
+        running = sum(1 for job in active if job.state != JobState.QUEUED)
+        percent = sum(job.percent for job in active) / len(active)
+        self.progress_frame.pack(fill=tk.X, pady=(0, 25), before=self.jobs_tree)
+        self.progress_var.set(percent)
+        self.progress_percent.config(text=f"{percent:.0f}%")
+        self.progress_status.config(text=f"Casting {running} download spell(s) "
+                                         f"({self.engine.max_workers} parallel), "
+                                         f"{len(active) - running} queued...")
+        self.cancel_btn.pack(fill=tk.X, ipady=6, pady=(8, 0))
+
+    def add_log(self, message, level="info"):
+        """Append to the log model; rendered on the next UI tick"""
+        self.log_buffer.append(level, message)
+        # Chamadas fora de um lote do bridge (handlers do Tk) também precisam do tick
+        self.bridge.request_tick()
+
+    def on_concurrency_decision(self, decision):
+        """Registrar a decisão do controle adaptativo e atualizar metrics.json"""
+        if decision.changed:
+            self.add_log(f"⚡ Parallel quests {decision} ({format_bytes(decision.throughput)}/s)")
+        else:
+            self.add_log(f"⚡ Parallel quests {decision}", "debug")
+        try:
+            self.engine.dump_metrics(data_file("metrics.json"))
+        except OSError as e:
+            self.add_log(f"Metrics dump failed: {e}", "warning")
+
+    def on_speed_limit_change(self, event=None):
+        """Aplicar o limite de banda a todos os jobs, inclusive os em andamento"""
+        rate = parse_rate(self.limit_var.get())
+        self.engine.set_bandwidth_limit(rate)
+        self.add_log(f"Bandwidth limit: {format_bytes(rate) + '/s' if rate else 'unlimited'}")
+
+    def on_log_level_change(self, event=None):
+        """Trocar o filtro de nível do log"""
+        self.log_buffer.set_min_level(self.log_level_combo.get())
+        self.log_console.flush()
 
     def browse_path(self):
         """Open a folder selection dialog and update download path"""
@@ -621,25 +732,24 @@ class MediaSlayerGUI:
             self.download_path_var.set(selected)
             self.download_path = selected
 
-    class YTDLogger:
-        """Custom logger for yt-dlp that writes to GUI log"""
-        def __init__(self, callback):
-            self._callback = callback
-        def debug(self, msg):
-            self._callback(msg)
-        def info(self, msg):
-            self._callback(msg)
-        def warning(self, msg):
-            self._callback(f"WARNING: {msg}")
-        def error(self, msg):
-            self._callback(f"ERROR: {msg}")
-
-def main():
-    """Função principal"""
-    root = tk.Tk()
+def main(urls=None):
+    """Função principal (``urls``: links passados na linha de comando)"""
+    with PROFILE.measure("tk.Tk()"):
+        root = tk.Tk()
     app = MediaSlayerGUI(root)
+    if urls:
+        app.queue_urls(urls)
     
     def on_closing():
+        app.bridge.stop()
+        app.analyzer.stop()
+        app.instance.stop()
+        for importer in app.importers:
+            importer.cancel()
+        # Jobs pendentes ficam no journal (e os .part no disco) para a próxima sessão
+        if app.journal is not None:
+            app.journal.close()
+        app.engine.shutdown(cancel_jobs=app.journal is None)
         root.quit()
         root.destroy()
     
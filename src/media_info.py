@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Media info helpers
+Utilidades para reaproveitar info dicts já extraídos pelo yt-dlp
+"""
+
+import re
+import time
+from urllib.parse import parse_qs, urlparse
+
+# Margem de segurança antes da expiração das URLs assinadas
+EXPIRY_MARGIN = 5 * 60
+# Validade assumida quando o extractor não publica a expiração (ex.: X/Twitter)
+DEFAULT_STREAM_TTL = 30 * 60
+
+_EXPIRE_PATH_RE = re.compile(r'/expire/(\d+)')
+
+
+def _url_expiry(url):
+    """Return the ``expire`` timestamp embedded in a signed stream URL"""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    values = parse_qs(parsed.query).get('expire')
+    if values and values[0].isdigit():
+        return int(values[0])
+    match = _EXPIRE_PATH_RE.search(parsed.path)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def _iter_videos(info):
+    if info.get('_type') == 'playlist':
+        for entry in info.get('entries') or []:
+            if entry:
+                yield from _iter_videos(entry)
+    else:
+        yield info
+
+
+def stream_urls_expire_at(info):
+    """Earliest time at which any stream URL of ``info`` stops working"""
+    expiries = []
+    for video in _iter_videos(info):
+        for fmt in video.get('formats') or [video]:
+            for url in (fmt.get('url'), fmt.get('manifest_url')):
+                expiry = _url_expiry(url)
+                if expiry:
+                    expiries.append(expiry)
+    if expiries:
+        return min(expiries)
+
+    extracted_at = info.get('epoch')
+    if extracted_at:
+        return extracted_at + DEFAULT_STREAM_TTL
+    return None
+
+
+def is_info_fresh(info, margin=EXPIRY_MARGIN, now=None):
+    """True when the stream URLs in ``info`` can still be used for a download"""
+    if not info:
+        return False
+    expires_at = stream_urls_expire_at(info)
+    if expires_at is None:
+        return False
+    return (now or time.time()) + margin < expires_at
+
+
+def is_expired_stream_error(error):
+    """Heuristic: download failed because the signed URLs expired"""
+    message = str(error)
+    return 'HTTP Error 403' in message or 'HTTP Error 410' in message
@@ -5,6 +5,7 @@ Launcher silencioso para o MediaSlayer
 Arquivo .pyw é executado automaticamente sem terminal
 """
 
+import multiprocessing
 import os
 import sys
 
@@ -12,8 +13,14 @@ import sys
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-# Importar e executar o MediaSlayer
-from media_downloader_gui import main
+from single_instance import forward_to_running
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    multiprocessing.freeze_support()
+    urls = sys.argv[1:]
+    # Janela já aberta: só repassar as URLs (sem carregar Tk/yt-dlp)
+    if not forward_to_running(urls):
+        # Importar e executar o MediaSlayer
+        from media_downloader_gui import main
+        main(urls)
\ No newline at end of file
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Metadata Cache
+Cache persistente (SQLite) de info dicts do yt-dlp, indexado pelo ID
+canônico do vídeo, válido enquanto as URLs de stream assinadas valem, com
+despejo LRU limitado por tamanho.
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+from app_paths import data_file
+from media_info import EXPIRY_MARGIN, stream_urls_expire_at
+
+# Campos volumosos que a aplicação não usa
+_DROPPED_KEYS = {
+    'automatic_captions', 'subtitles', 'requested_subtitles', 'heatmap',
+    'thumbnails', 'requested_downloads', 'filepath', 'filename', '_filename',
+    'infojson_filename',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    streams_expire_at REAL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS aliases (
+    url TEXT PRIMARY KEY,
+    key TEXT NOT NULL
+);
+"""
+
+
+def cache_key(info):
+    """Canonical ``platform:id`` key of an extracted info dict"""
+    extractor = (info.get('extractor_key') or info.get('extractor') or '').lower()
+    video_id = info.get('id')
+    if not extractor or not video_id:
+        return None
+    return f"{extractor}:{video_id}"
+
+
+def trim_info(obj):
+    """Drop bulky/private fields so the entry stays small and JSON-able"""
+    if isinstance(obj, dict):
+        return {k: trim_info(v) for k, v in obj.items()
+                if k not in _DROPPED_KEYS and not k.startswith('__')}
+    if isinstance(obj, (list, tuple)):
+        return [trim_info(v) for v in obj]
+    return obj
+
+
+class MetadataCache:
+    """Persistent info-dict cache shared by analysis and downloads.
+
+    Both only use an entry to download from, so an entry lives as long as
+    its signed stream URLs are usable (minus a safety margin); info dicts
+    without a known expiry are not stored. :meth:`stats` exposes the
+    hit/miss counters (see :meth:`download_engine.DownloadEngine.metrics`).
+    """
+
+    def __init__(self, path=None, max_entries=500, max_bytes=64 * 1024 * 1024):
+        self.path = path or data_file("metadata_cache.sqlite3")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def lookup_url(self, url):
+        """Key previously stored for ``url``, if any"""
+        with self._lock:
+            row = self._conn.execute("SELECT key FROM aliases WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, key):
+        """Cached info for ``key`` or None (counts as hit/miss)"""
+        now = time.time()
+        with self._lock:
+            row = None
+            if key:
+                row = self._conn.execute(
+                    "SELECT info, streams_expire_at FROM entries WHERE key = ?",
+                    (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            info, streams_expire_at = row
+            if streams_expire_at is None or now + EXPIRY_MARGIN >= streams_expire_at:
+                # URLs de stream vencidas: a entrada não serve mais para nada
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stale += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(info)
+
+    def put(self, info, urls=()):
+        """Store ``info`` under its canonical key and alias ``urls`` to it"""
+        key = cache_key(info)
+        streams_expire_at = stream_urls_expire_at(info)
+        if key is None or streams_expire_at is None:
+            return None
+
+        payload = json.dumps(trim_info(info), default=str)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, streams_expire_at, streams_expire_at, now))
+            for url in urls:
+                self._conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (url, key))
+            self._evict()
+            self._conn.commit()
+        return key
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """LRU eviction down to max_entries / max_bytes (lock held)"""
+        entries, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+        victims = []
+        for key, entry_size in rows:
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            victims.append((key,))
+            entries -= 1
+            size -= entry_size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._conn.execute("DELETE FROM aliases WHERE key NOT IN (SELECT key FROM entries)")
+        self.evictions += len(victims)
+
+
+def open_default_cache():
+    """Open the cache in the data directory, or None if unavailable"""
+    try:
+        return MetadataCache()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Metadata cache disabled: {e}", file=sys.stderr)
+        return None
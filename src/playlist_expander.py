@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Playlist Expander
+Expansão preguiçosa de playlists e canais: extração "flat", página por
+página, com os vídeos entrando na fila à medida que cada página chega.
+"""
+
+from bulk_import import BulkImporter, ImportEntry
+from download_engine import build_extract_opts
+from url_normalizer import is_collection_url
+from ytdlp_loader import load_yt_dlp
+
+# Canal -> abas (Videos, Shorts, Live) -> vídeos
+_MAX_DEPTH = 2
+
+
+def iter_playlist(url, on_title=None):
+    """Video entries of a playlist/channel, yielded as yt-dlp lists each page.
+
+    Extraction runs with ``process=False``: the extractor's entry generator
+    is consumed lazily, so nothing beyond the current page is fetched or
+    kept in memory. ``on_title(title)`` is called for every (sub)playlist.
+    """
+    opts = build_extract_opts('youtube')
+    opts.update({'extract_flat': 'in_playlist', 'lazy_playlist': True, 'skip_download': True})
+    with load_yt_dlp().YoutubeDL(opts) as ydl:
+        yield from _walk(ydl, ydl.extract_info(url, download=False, process=False), 0, on_title)
+
+
+def _walk(ydl, result, depth, on_title):
+    # Redirecionamentos (ex.: link curto de canal -> aba de vídeos)
+    for _ in range(3):
+        if result.get('_type') not in ('url', 'url_transparent') or 'entries' in result:
+            break
+        result = ydl.extract_info(result['url'], download=False, process=False)
+
+    if 'entries' not in result:
+        url = result.get('webpage_url') or result.get('url')
+        if url:
+            yield ImportEntry(url)
+        return
+
+    if on_title is not None and result.get('title'):
+        on_title(result['title'])
+    for entry in result['entries']:
+        if not entry:
+            continue
+        url = entry.get('url') or entry.get('webpage_url')
+        if 'entries' in entry or entry.get('_type') == 'playlist' or (url and is_collection_url(url)):
+            if depth < _MAX_DEPTH:
+                if 'entries' not in entry:
+                    entry = ydl.extract_info(url, download=False, process=False)
+                yield from _walk(ydl, entry, depth + 1, on_title)
+            continue
+        if url:
+            yield ImportEntry(url)
+
+
+def expand_playlist(engine, url, format_type, quality, download_path, on_progress=None, on_title=None):
+    """:class:`bulk_import.BulkImporter` that streams a playlist into ``engine``
+
+    Call ``start()`` on it; the first videos are queued (and start
+    downloading) while later pages are still being listed.
+    """
+    return BulkImporter(engine, iter_playlist(url, on_title), format_type, quality, download_path,
+                        on_progress, batch_size=20)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Post-processing
+Etapa de CPU separada dos workers de rede: merge de vídeo+áudio, extração
+de áudio (MP3/WAV), remux e embed de thumbnail com o FFmpeg, num pool
+dimensionado pelo número de CPUs.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Sem janela de console para o FFmpeg no launcher silencioso (Windows)
+_CREATION_FLAGS = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+# Containers que aceitam a thumbnail como capa
+_THUMBNAIL_CONTAINERS = ("mp4", "m4a", "mp3")
+
+
+class PostProcessError(Exception):
+    """FFmpeg failed on a job's files"""
+
+
+class PostProcessCancelled(Exception):
+    """The job was cancelled while FFmpeg was running"""
+
+
+def ffmpeg_path():
+    return shutil.which('ffmpeg')
+
+
+def can_embed_thumbnail(path):
+    """Whether the container of ``path`` (or a bare extension) takes a cover image"""
+    return path.rsplit('.', 1)[-1].lower() in _THUMBNAIL_CONTAINERS
+
+
+class PostProcessTask:
+    """What to do with the files a job downloaded.
+
+    ``action`` is ``"merge"`` (video + audio inputs), ``"extract_audio"``
+    (``codec`` mp3/wav), ``"remux"`` or None when only the thumbnail has to
+    be embedded. Plain attributes so the task can travel back from a worker
+    process.
+    """
+
+    def __init__(self, output, inputs, action=None, codec=None, thumbnail=None):
+        self.output = output
+        self.inputs = list(inputs)
+        self.action = action
+        self.codec = codec
+        self.thumbnail = thumbnail
+
+    @property
+    def needed(self):
+        return bool(self.action or self.thumbnail)
+
+    def remove_inputs(self):
+        """Delete the downloaded inputs (never the output); returns how many were removed"""
+        removed = 0
+        for path in self.inputs + ([self.thumbnail] if self.thumbnail else []):
+            if os.path.abspath(path) != os.path.abspath(self.output) and _remove(path):
+                removed += 1
+        return removed
+
+    def describe(self):
+        steps = []
+        if self.action == "merge":
+            steps.append("merge video+audio")
+        elif self.action == "extract_audio":
+            steps.append(f"convert to {self.codec.upper()}")
+        elif self.action == "remux":
+            steps.append(f"remux to .{self.output.rsplit('.', 1)[-1]}")
+        if self.thumbnail:
+            steps.append("embed thumbnail")
+        return ", ".join(steps)
+
+    def __repr__(self):
+        return f"<PostProcessTask {self.describe()} -> {self.output}>"
+
+
+def build_command(task, ffmpeg, temp_output):
+    """FFmpeg argv for ``task`` writing to ``temp_output``"""
+    ext = task.output.rsplit('.', 1)[-1].lower()
+    cmd = [ffmpeg, '-y', '-loglevel', 'error', '-nostdin']
+    for path in task.inputs:
+        cmd += ['-i', path]
+    thumbnail = task.thumbnail if ext in _THUMBNAIL_CONTAINERS else None
+    if thumbnail:
+        cmd += ['-i', thumbnail]
+
+    if task.action == "extract_audio":
+        cmd += ['-map', '0:a:0']
+        if task.codec == "mp3":
+            cmd += ['-c:a', 'libmp3lame', '-q:a', '2']
+        else:
+            cmd += ['-c:a', 'pcm_s16le']
+    elif task.action == "merge":
+        cmd += ['-map', '0:v:0', '-map', '1:a:0', '-c', 'copy']
+    else:
+        cmd += ['-map', '0', '-c', 'copy']
+
+    if thumbnail:
+        pic = len(task.inputs)
+        if ext == "mp3":
+            cmd += ['-map', f'{pic}:v:0', '-c:v', 'mjpeg', '-id3v2_version', '3',
+                    '-disposition:v', 'attached_pic']
+        else:
+            cmd += ['-map', f'{pic}:v:0', '-c:v:1', 'mjpeg', '-disposition:v:1', 'attached_pic']
+    if ext in ("mp4", "m4a"):
+        cmd += ['-movflags', '+faststart']
+    cmd.append(temp_output)
+    return cmd
+
+
+def _temp_path(output):
+    base, ext = os.path.splitext(output)
+    return f"{base}.temp{ext}"
+
+
+class PostProcessPool:
+    """CPU-sized pool that runs FFmpeg for finished downloads.
+
+    :meth:`submit` returns immediately; ``on_done(error)`` is called from a
+    pool thread with None on success. Inputs are deleted once the output is
+    in place. :meth:`cancel` kills the FFmpeg process of a job.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="MediaSlayerPostProcess")
+        self._lock = threading.Lock()
+        self._processes = {}
+        self._cancelled = set()
+        self._closed = False
+
+    def submit(self, key, task, on_done):
+        def run():
+            error = None
+            try:
+                self._run(key, task)
+            except Exception as e:
+                error = e
+            finally:
+                with self._lock:
+                    self._processes.pop(key, None)
+                    self._cancelled.discard(key)
+            on_done(error)
+        return self._executor.submit(run)
+
+    def cancel(self, key):
+        with self._lock:
+            self._cancelled.add(key)
+            process = self._processes.get(key)
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def shutdown(self):
+        """Kill running FFmpeg processes; queued tasks end as cancelled without starting"""
+        with self._lock:
+            # Sem isso as tarefas na fila rodariam depois do journal fechado
+            # (cancel_futures só existe a partir do Python 3.9)
+            self._closed = True
+            self._cancelled.update(self._processes)
+            processes = list(self._processes.values())
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, key, task):
+        ffmpeg = ffmpeg_path()
+        if ffmpeg is None:
+            raise PostProcessError("FFmpeg not found on PATH")
+        temp_output = _temp_path(task.output)
+        with self._lock:
+            if self._closed or key in self._cancelled:
+                raise PostProcessCancelled()
+            process = subprocess.Popen(build_command(task, ffmpeg, temp_output),
+                                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE, creationflags=_CREATION_FLAGS)
+            self._processes[key] = process
+        _, stderr = process.communicate()
+
+        with self._lock:
+            cancelled = self._closed or key in self._cancelled
+        if cancelled or process.returncode != 0:
+            _remove(temp_output)
+            if cancelled:
+                raise PostProcessCancelled()
+            message = stderr.decode('utf-8', 'replace').strip().splitlines()
+            raise PostProcessError(f"FFmpeg failed ({process.returncode}): "
+                                   f"{message[-1] if message else 'no output'}")
+
+        os.replace(temp_output, task.output)
+        task.remove_inputs()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Could not remove {path}: {e}", file=sys.stderr)
+    return False
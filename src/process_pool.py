@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Process Worker Pool
+Pool de processos com o yt-dlp já importado e os extractors inicializados.
+Cada job roda num processo isolado; progresso e log voltam por um Pipe.
+Cancelamento forçado = terminar o processo.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+
+# Campos do hook de progresso repassados ao processo principal
+_PROGRESS_KEYS = ('status', 'filename', 'tmpfilename', 'downloaded_bytes',
+                  'total_bytes', 'total_bytes_estimate', 'speed', 'eta')
+# Intervalo mínimo entre mensagens de progresso "downloading"
+_PROGRESS_INTERVAL = 0.1
+# Bytes acumulados antes de pedir liberação de banda ao processo principal
+_THROTTLE_QUANTUM = 256 * 1024
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while running a job"""
+
+
+class DownloadFailed(Exception):
+    """The job failed inside the worker process (the worker itself is fine)"""
+
+
+def _warm_up():
+    """Importar yt-dlp e instanciar os extractors usados pelo app"""
+    from ytdlp_loader import load_yt_dlp
+    yt_dlp = load_yt_dlp()
+
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+        for name in ('Youtube', 'YoutubeTab', 'Twitter'):
+            try:
+                ydl.get_info_extractor(name)
+            except Exception:
+                pass
+
+
+class _PipeSink:
+    """TaskSink that forwards everything to the parent process.
+
+    Sends are serialized (segmented downloads report from several threads).
+    :meth:`throttle` is a round trip: the parent draws the bytes from the
+    engine's shared bandwidth limiter and answers ``('grant',)``.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._last_progress = 0.0
+        self._send_lock = threading.Lock()
+        self._throttle_lock = threading.Lock()
+        self._unpaid = 0
+
+    def _send(self, message):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def extracting(self):
+        self._send(('extracting',))
+
+    def downloading(self):
+        self._send(('downloading',))
+
+    def info(self, info):
+        from ytdlp_loader import load_yt_dlp
+        self._send(('info', load_yt_dlp().YoutubeDL.sanitize_info(info)))
+
+    def log(self, message, level="info"):
+        self._send(('log', level, message))
+
+    def progress(self, d):
+        now = time.monotonic()
+        if d.get('status') == 'downloading' and now - self._last_progress < _PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self._send(('progress', {key: d.get(key) for key in _PROGRESS_KEYS}))
+
+    def throttle(self, nbytes):
+        with self._throttle_lock:
+            self._unpaid += nbytes
+            if self._unpaid < _THROTTLE_QUANTUM:
+                return
+            unpaid, self._unpaid = self._unpaid, 0
+            self._send(('throttle', unpaid))
+            self._conn.recv()  # ('grant',)
+
+    def check_abort(self):
+        # O processo principal encerra o worker; nada a checar aqui
+        pass
+
+
+def worker_main(conn):
+    """Entry point of a worker process"""
+    _warm_up()
+    from download_task import run_download
+
+    conn.send(('ready', os.getpid()))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] == 'stop':
+            return
+        if message[0] != 'run':
+            continue  # ('grant',) atrasado de um job que já terminou
+
+        spec = message[1]
+        try:
+            task = run_download(spec['url'], spec['opts'], spec['info'], spec['reused'],
+                                _PipeSink(conn), request=spec.get('request'),
+                                connections=spec.get('connections', 1))
+            conn.send(('done', task))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class WorkerProcess:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,),
+                                       name="MediaSlayerWorker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    @property
+    def exitcode(self):
+        return self.process.exitcode
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def run(self, spec):
+        self.conn.send(('run', spec))
+
+    def grant(self):
+        """Answer a ``throttle`` request"""
+        self.conn.send(('grant',))
+
+    def poll(self, timeout):
+        return self.conn.poll(timeout)
+
+    def recv(self):
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.process.join(0.5)
+            raise WorkerCrashed(f"Worker process exited (code {self.exitcode})") from e
+
+    def terminate(self):
+        """Hard stop: used for cancellation and crashed workers"""
+        self.process.terminate()
+        self.process.join(2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.terminate()
+        else:
+            self.conn.close()
+
+
+class ProcessWorkerPool:
+    """Keeps up to ``size`` idle, pre-warmed worker processes.
+
+    Workers are spawned (not forked) so they behave the same on Windows;
+    :meth:`warm_async` starts them in the background while the UI comes up.
+    """
+
+    def __init__(self, size=3):
+        self.size = size
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def warm_async(self):
+        threading.Thread(target=self._warm, name="MediaSlayerPoolWarmup", daemon=True).start()
+
+    def _warm(self):
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self.size:
+                    return
+            worker = WorkerProcess(self._context)
+            with self._lock:
+                self._idle.append(worker)
+
+    def acquire(self):
+        """Idle worker (or a freshly spawned one)"""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+        return WorkerProcess(self._context)
+
+    def release(self, worker):
+        """Return a healthy worker to the pool"""
+        with self._lock:
+            if not self._closed and worker.is_alive() and len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def discard(self, worker):
+        """Terminate a cancelled or crashed worker and warm a replacement"""
+        worker.terminate()
+        self.warm_async()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Segmented Downloader
+Download de um arquivo progressivo em segmentos (HTTP Range) por várias
+conexões reaproveitadas, num arquivo pré-alocado, com checkpoint por
+segmento para retomar de onde parou.
+"""
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+from throughput import ThroughputMeter
+
+_CHUNK = 256 * 1024
+_MAX_REDIRECTS = 5
+
+
+class SegmentedUnsupported(Exception):
+    """The server can't serve this URL in ranges (no size / no 206 on the probe)"""
+
+
+class RangeRequestFailed(Exception):
+    """A range request was refused mid-transfer (neither 206 nor a 5xx)"""
+
+
+class _Connection:
+    """One keep-alive HTTP(S) connection, reopened on redirects and errors"""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._conn = None
+        self._origin = None
+
+    def request(self, url, headers):
+        """GET ``url``; returns the response after following redirects"""
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            origin = (parts.scheme, parts.netloc)
+            if self._conn is None or self._origin != origin:
+                self.close()
+                cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+                self._conn = cls(parts.netloc, timeout=self.timeout)
+                self._origin = origin
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+            try:
+                self._conn.request('GET', path, headers=headers)
+                response = self._conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                self.close()
+                raise
+            if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+                response.read()
+                url = urllib.parse.urljoin(url, response.getheader('Location'))
+                continue
+            return response
+        raise http.client.HTTPException("Too many redirects")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SegmentedDownloader:
+    """Fetch ``url`` into ``path`` over ``connections`` parallel ranges.
+
+    The size is probed with a one-byte range request; servers that don't
+    answer 206 raise :class:`SegmentedUnsupported` so the caller can fall
+    back to a single stream (after :meth:`discard`). Once the transfer has
+    started, 5xx replies and connection errors are retried like dropped
+    connections; any other status raises :class:`RangeRequestFailed`.
+    Data goes to ``path + '.part'`` (preallocated) and the finished byte
+    count of every segment to ``path + '.part.segments'``, so an
+    interrupted download resumes where each segment stopped.
+
+    ``progress(d)`` receives yt-dlp style dicts (``status``,
+    ``downloaded_bytes``, ``total_bytes``, ``speed``, ``filename``,
+    ``tmpfilename``) from the calling thread every ``progress_interval``
+    seconds; an exception raised by it (e.g. a cancellation) stops every
+    connection and propagates. ``throttle(nbytes)`` is called by every
+    connection after each chunk it writes (bandwidth limiting); it may sleep
+    or raise in the same way.
+    """
+
+    def __init__(self, url, path, headers=None, connections=4, min_segment=2 * 1024 * 1024,
+                 retries=3, timeout=30, progress=None, progress_interval=0.2, throttle=None):
+        self.url = url
+        self.path = path
+        self.headers = dict(headers or {})
+        self.connections = max(1, connections)
+        self.min_segment = min_segment
+        self.retries = retries
+        self.timeout = timeout
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.throttle = throttle
+        self.tmp_path = path + '.part'
+        self.checkpoint_path = self.tmp_path + '.segments'
+        self.size = None
+        self.segments = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._errors = []
+
+    # ------------------------------------------------------------------
+    # Preparação
+    # ------------------------------------------------------------------
+    def probe(self):
+        """Total size from a ``Range: bytes=0-0`` request"""
+        conn = _Connection(self.timeout)
+        try:
+            response = conn.request(self.url, dict(self.headers, Range='bytes=0-0'))
+            response.read()
+            if response.status >= 500:
+                # Erro temporário: o job é repetido, sem trocar de downloader
+                raise http.client.HTTPException(f"HTTP Error {response.status}: {response.reason}")
+            content_range = response.getheader('Content-Range') or ''
+            if response.status != 206 or '/' not in content_range:
+                raise SegmentedUnsupported(f"No range support (HTTP {response.status})")
+            total = content_range.rsplit('/', 1)[1]
+            if not total.isdigit():
+                raise SegmentedUnsupported("Unknown file size")
+            self.size = int(total)
+            return self.size
+        finally:
+            conn.close()
+
+    def plan_segments(self):
+        """Resume from the checkpoint or split ``size`` into fresh segments"""
+        checkpoint = self._load_checkpoint()
+        if checkpoint is not None:
+            self.segments = checkpoint
+            return self.segments
+
+        count = max(1, min(self.connections * 4, self.size // self.min_segment))
+        step = -(-self.size // count)
+        self.segments = [[start, min(start + step, self.size) - 1, 0]
+                         for start in range(0, self.size, step)]
+        # Pré-alocar o arquivo inteiro (cada conexão escreve no seu offset)
+        with open(self.tmp_path, 'wb') as f:
+            f.truncate(self.size)
+        self._save_checkpoint()
+        return self.segments
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (data.get('size') != self.size or not os.path.exists(self.tmp_path)
+                or os.path.getsize(self.tmp_path) != self.size):
+            return None
+        return [list(segment) for segment in data['segments']]
+
+    def _save_checkpoint(self):
+        with self._lock:
+            data = {'size': self.size, 'segments': [list(segment) for segment in self.segments]}
+        temp = self.checkpoint_path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp, self.checkpoint_path)
+
+    def discard(self):
+        """Delete the ``.part`` file and checkpoint left by an earlier segmented run.
+
+        Called before another downloader takes over the same path: the
+        preallocated ``.part`` is mostly zeros, so it can't be resumed as a
+        plain partial file. A ``.part`` without checkpoint isn't ours and is kept.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return
+        for path in (self.tmp_path, self.checkpoint_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def downloaded(self):
+        with self._lock:
+            return sum(segment[2] for segment in self.segments)
+
+    # ------------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------------
+    def download(self):
+        """Download (or resume) the whole file; returns ``path``"""
+        if self.size is None:
+            self.probe()
+        self.plan_segments()
+
+        pending = queue.Queue()
+        for segment in self.segments:
+            if segment[0] + segment[2] <= segment[1]:
+                pending.put(segment)
+        workers = [threading.Thread(target=self._worker, args=(pending,),
+                                    name=f"MediaSlayerSegment-{i}", daemon=True)
+                   for i in range(min(self.connections, pending.qsize()))]
+        for worker in workers:
+            worker.start()
+
+        meter = ThroughputMeter()
+        last_bytes = self.downloaded
+        last_checkpoint = time.monotonic()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(self.progress_interval / len(workers))
+                downloaded = self.downloaded
+                meter.add(downloaded - last_bytes)
+                last_bytes = downloaded
+                if time.monotonic() - last_checkpoint >= 1.0:
+                    last_checkpoint = time.monotonic()
+                    self._save_checkpoint()
+                self._report('downloading', downloaded, meter.rate())
+                if self._errors:
+                    raise self._errors[0]
+        except BaseException:
+            self._stop.set()
+            for worker in workers:
+                worker.join(self.timeout)
+            self._save_checkpoint()
+            raise
+
+        if self._errors:
+            self._save_checkpoint()
+            raise self._errors[0]
+        os.replace(self.tmp_path, self.path)
+        try:
+            os.remove(self.checkpoint_path)
+        except OSError:
+            pass
+        self._report('finished', self.size, None)
+        return self.path
+
+    def _worker(self, pending):
+        conn = _Connection(self.timeout)
+        try:
+            # Sem buffer: o checkpoint nunca conta bytes que não chegaram ao SO
+            with open(self.tmp_path, 'r+b', buffering=0) as f:
+                while not self._stop.is_set():
+                    try:
+                        segment = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    self._fetch_segment(conn, f, segment)
+        except Exception as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            conn.close()
+
+    def _fetch_segment(self, conn, f, segment):
+        attempt = 0
+        while not self._stop.is_set():
+            start = segment[0] + segment[2]
+            if start > segment[1]:
+                return
+            try:
+                response = conn.request(self.url, dict(self.headers, Range=f'bytes={start}-{segment[1]}'))
+                if response.status != 206:
+                    response.read()
+                    message = f"HTTP Error {response.status}: {response.reason}"
+                    if response.status >= 500:
+                        raise http.client.HTTPException(message)  # nova tentativa abaixo
+                    raise RangeRequestFailed(message)
+                f.seek(start)
+                while not self._stop.is_set():
+                    data = response.read(min(_CHUNK, segment[1] - segment[0] - segment[2] + 1))
+                    if not data:
+                        break
+                    _write_all(f, data)
+                    with self._lock:
+                        segment[2] += len(data)
+                    if self.throttle is not None:
+                        self.throttle(len(data))
+                if self._stop.is_set():
+                    conn.close()
+                    return
+                if segment[0] + segment[2] <= segment[1]:
+                    # Conexão fechada antes do fim do range
+                    raise http.client.IncompleteRead(b'', segment[1] - segment[0] - segment[2] + 1)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                attempt = attempt + 1 if segment[0] + segment[2] == start else 1
+                if attempt > self.retries:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+    def _report(self, status, downloaded, speed):
+        if self.progress is None:
+            return
+        self.progress({
+            'status': status,
+            'downloaded_bytes': downloaded,
+            'total_bytes': self.size,
+            'speed': speed,
+            'filename': self.path,
+            'tmpfilename': self.tmp_path,
+        })
+
+
+def _write_all(f, data):
+    view = memoryview(data)
+    while view:
+        written = f.write(view)
+        view = view[written:]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Single Instance
+Uma única janela por usuário: a primeira instância escuta num socket
+local e as seguintes apenas repassam suas URLs a ela e saem, sem pagar
+o custo de Tk + yt-dlp. Importa só a biblioteca padrão.
+"""
+
+import hmac
+import json
+import os
+import secrets
+import socket
+import threading
+
+from app_paths import data_file
+
+DEFAULT_PORT = 47653
+_TOKEN_FILE = "instance.token"
+_MAX_MESSAGE = 64 * 1024
+
+
+def forward_to_running(urls, port=DEFAULT_PORT, timeout=0.5):
+    """Hand ``urls`` to a running instance (empty: just raise its window).
+
+    Returns True when an instance acknowledged them, i.e. this launch can
+    exit. Any failure (no instance, stale token, port used by something
+    else) returns False and the caller starts normally.
+    """
+    try:
+        with open(data_file(_TOKEN_FILE), "r", encoding="utf-8") as f:
+            token = f.read().strip()
+    except OSError:
+        return False
+    message = json.dumps({'token': token, 'command': 'open', 'urls': list(urls)}) + "\n"
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+            sock.sendall(message.encode("utf-8"))
+            reply = sock.makefile("r", encoding="utf-8").readline()
+        return json.loads(reply).get('ok') is True
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+class InstanceServer:
+    """Listener of the first instance.
+
+    Binds ``127.0.0.1:port`` (the bind itself decides which launch is the
+    first one) and writes a random token to the data directory; only
+    clients that can read it (same user) are accepted.
+    ``on_message(command, urls)`` is called from the listener thread.
+    """
+
+    def __init__(self, on_message, port=DEFAULT_PORT):
+        self.on_message = on_message
+        self.port = port
+        self.token = secrets.token_hex(16)
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        """Start listening; False if another instance (or program) holds the port"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name == "nt":
+            # Sem isso outro processo poderia "roubar" a porta no Windows
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("127.0.0.1", self.port))
+            sock.listen(8)
+            self._write_token()
+        except OSError:
+            sock.close()
+            return False
+        self._sock = sock
+        self._thread = threading.Thread(target=self._serve, name="MediaSlayerInstance", daemon=True)
+        self._thread.start()
+        return True
+
+    def _write_token(self):
+        path = data_file(_TOKEN_FILE)
+        temp = path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(self.token)
+        if os.name != "nt":
+            os.chmod(temp, 0o600)
+        os.replace(temp, path)
+
+    def _serve(self):
+        sock = self._sock
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return  # socket fechado em stop()
+            try:
+                self._handle(conn)
+            except (OSError, ValueError) as e:
+                print(f"Instance message ignored: {e}")
+            finally:
+                conn.close()
+
+    def _handle(self, conn):
+        conn.settimeout(2.0)
+        data = b""
+        while not data.endswith(b"\n") and len(data) < _MAX_MESSAGE:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        message = json.loads(data.decode("utf-8"))
+        if not isinstance(message, dict):
+            raise ValueError("expected a JSON object")
+        if not hmac.compare_digest(str(message.get('token', '')), self.token):
+            conn.sendall(b'{"ok": false, "error": "bad token"}\n')
+            return
+        urls = [url for url in message.get('urls') or [] if isinstance(url, str)]
+        self.on_message(message.get('command', 'open'), urls)
+        conn.sendall(b'{"ok": true}\n')
+
+    def stop(self):
+        if self._sock is None:
+            return
+        try:
+            # Desbloqueia o accept() da thread (close sozinho não basta no Linux)
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._sock = None
+        # Só apaga o token se ainda for o desta instância
+        try:
+            path = data_file(_TOKEN_FILE)
+            with open(path, "r", encoding="utf-8") as f:
+                ours = f.read().strip() == self.token
+            if ours:
+                os.remove(path)
+        except OSError:
+            pass
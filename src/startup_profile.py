@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Startup Profile
+Medição do caminho de inicialização (imports, estilos, UI, gradiente,
+primeira pintura) para acompanhar regressões de cold start.
+"""
+
+import time
+from contextlib import contextmanager
+
+# Referência: momento em que este módulo foi importado (início do launcher)
+T0 = time.perf_counter()
+
+
+class StartupProfile:
+    """Named spans and marks, in milliseconds since ``origin``"""
+
+    def __init__(self, origin=None):
+        self.origin = T0 if origin is None else origin
+        self.spans = []
+        self.marks = {}
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((name, (start - self.origin) * 1000, (end - start) * 1000))
+
+    def add_span(self, name, start, end):
+        """Record a span measured elsewhere (perf_counter timestamps)"""
+        self.spans.append((name, (start - self.origin) * 1000, (end - start) * 1000))
+
+    def mark(self, name):
+        """Record the first time ``name`` happens"""
+        self.marks.setdefault(name, (time.perf_counter() - self.origin) * 1000)
+
+    def duration(self, name):
+        for span_name, _, duration in self.spans:
+            if span_name == name:
+                return duration
+        return None
+
+    def report(self):
+        lines = [f"{'phase':<32} {'start ms':>10} {'took ms':>10}"]
+        for name, start, duration in sorted(self.spans, key=lambda span: span[1]):
+            lines.append(f"{name:<32} {start:>10.1f} {duration:>10.1f}")
+        for name, at in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"{name:<32} {at:>10.1f} {'':>10}")
+        return "\n".join(lines)
+
+
+PROFILE = StartupProfile()
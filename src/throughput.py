@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - Throughput
+Medição de vazão (bytes/s) em janela deslizante
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class ThroughputMeter:
+    """Bytes per second over a sliding time window.
+
+    Feed it byte deltas with :meth:`add`; :meth:`rate` sums the samples that
+    are still inside the window. Safe to share between threads.
+    """
+
+    def __init__(self, window=5.0):
+        self.window = window
+        self.total = 0
+        self._samples = deque()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, nbytes, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.total += nbytes
+            self._samples.append((now, nbytes))
+            self._trim(now)
+
+    def rate(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._trim(now)
+            span = min(self.window, now - self._started)
+            if span <= 0:
+                return 0.0
+            return sum(n for _, n in self._samples) / span
+
+    def reset(self, now=None):
+        with self._lock:
+            self.total = 0
+            self._samples.clear()
+            self._started = time.monotonic() if now is None else now
+
+    def _trim(self, now):
+        cutoff = now - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+
+def format_bytes(nbytes):
+    """Human readable size (``1.5 MB``)"""
+    if nbytes is None:
+        return "?"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(nbytes) < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024.0
+
+
+def format_eta(seconds):
+    """``m:ss`` / ``h:mm:ss`` for an ETA in seconds"""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
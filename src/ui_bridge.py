@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - UI Bridge
+Canal único engine -> interface: threads de trabalho enfileiram callbacks
+e o main loop do Tk os executa em lotes num tick de intervalo fixo.
+"""
+
+import queue
+
+
+class UIBridge:
+    """Thread-safe queue drained by the Tk main loop.
+
+    Worker threads call :meth:`post`; they never touch widgets nor call
+    ``root.after`` themselves. Every ``interval_ms`` the main loop runs up to
+    ``max_batch`` queued callbacks, then the tick callbacks once, so the cost
+    per tick is bounded no matter how many jobs are producing events.
+    Changes made outside a callback (e.g. directly by a Tk handler) ask for
+    the next tick with :meth:`request_tick`.
+    """
+
+    def __init__(self, root, interval_ms=50, max_batch=500):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._tick_callbacks = []
+        self._tick_requested = False
+        self._after_id = None
+
+    def post(self, callback, *args):
+        """Schedule ``callback(*args)`` on the main loop (any thread)"""
+        self._queue.put((callback, args))
+
+    def add_tick_callback(self, callback):
+        """Run ``callback()`` on the main loop after every non-empty batch"""
+        self._tick_callbacks.append(callback)
+
+    def request_tick(self):
+        """Run the tick callbacks on the next drain even if nothing is queued"""
+        self._tick_requested = True
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _drain(self):
+        processed = 0
+        while processed < self.max_batch:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            processed += 1
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"UI callback error: {e}")
+
+        if processed or self._tick_requested:
+            self._tick_requested = False
+            for callback in self._tick_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"UI tick error: {e}")
+
+        self._after_id = self.root.after(self.interval_ms, self._drain)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - URL Analyzer
+Debounce da digitação e um único worker de análise que descarta
+requisições superadas (sempre vale a URL mais recente).
+"""
+
+import threading
+
+
+class Debouncer:
+    """Run ``callback`` only after ``delay_ms`` without new triggers.
+
+    ``scheduler`` is anything with Tk's ``after``/``after_cancel`` API;
+    every trigger cancels the pending timer so only the last one fires.
+    """
+
+    def __init__(self, scheduler, delay_ms, callback):
+        self._scheduler = scheduler
+        self.delay_ms = delay_ms
+        self._callback = callback
+        self._after_id = None
+
+    def trigger(self, *args):
+        self.cancel()
+        self._after_id = self._scheduler.after(self.delay_ms, self._fire, *args)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self._scheduler.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _fire(self, *args):
+        self._after_id = None
+        self._callback(*args)
+
+
+class AnalysisResult:
+    """Outcome of one analysis, tagged with the URL it belongs to"""
+
+    def __init__(self, url, info=None, error=None):
+        self.url = url
+        self.info = info
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None and self.info is not None
+
+
+class AnalysisWorker:
+    """Single supervised thread that analyses the latest requested URL.
+
+    Only one request is kept pending: a newer ``request`` replaces it, and a
+    result whose request was superseded while extracting is dropped instead
+    of being delivered. ``on_result`` is called from the worker thread.
+    """
+
+    def __init__(self, extract, on_result):
+        self._extract = extract
+        self._on_result = on_result
+        self._cond = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._running = None
+        self._stopped = False
+        self._thread = None
+
+    def request(self, url):
+        """Analyse ``url``, superseding any pending or running request"""
+        with self._cond:
+            # A mesma URL já está sendo analisada e continua válida
+            if self._pending is None and self._running == (self._generation, url):
+                return
+            self._generation += 1
+            self._pending = (self._generation, url)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def cancel(self):
+        """Drop the pending request and ignore the one in flight"""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+
+    def _ensure_thread(self):
+        # Supervisão: recria o worker se ele morreu
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="MediaSlayerAnalyzer", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                generation, url = self._pending
+                self._pending = None
+                self._running = (generation, url)
+
+            try:
+                result = AnalysisResult(url, info=self._extract(url))
+            except Exception as e:
+                result = AnalysisResult(url, error=e)
+
+            with self._cond:
+                self._running = None
+                superseded = generation != self._generation
+            if not superseded:
+                self._on_result(result)
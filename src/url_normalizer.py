@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - URL Normalizer
+Reduz as várias grafias de um link do YouTube ou X (Twitter) a uma chave
+canônica ``plataforma:id`` usada pela fila, pelos caches e pelo histórico.
+"""
+
+import re
+from collections import namedtuple
+from urllib.parse import parse_qs, urlsplit
+
+_YOUTUBE_HOST_RE = re.compile(r'^(?:[\w-]+\.)*(?:youtube\.com|youtube-nocookie\.com|youtu\.be)$')
+_TWITTER_HOST_RE = re.compile(r'^(?:[\w-]+\.)*(?:twitter\.com|x\.com|t\.co)$')
+
+_YOUTUBE_ID_RE = re.compile(r'^[0-9A-Za-z_-]{11}$')
+_YOUTUBE_PATH_RE = re.compile(r'^/(?:shorts|embed|live|v|e)/([0-9A-Za-z_-]{11})(?:[/?#]|$)')
+_YOUTU_BE_PATH_RE = re.compile(r'^/([0-9A-Za-z_-]{11})(?:[/?#]|$)')
+_TWITTER_STATUS_RE = re.compile(r'^/(?:[^/]+|i(?:/web)?)/status(?:es)?/(\d+)')
+_CHANNEL_PREFIXES = ('/@', '/channel/', '/c/', '/user/')
+
+
+class MediaKey(namedtuple('MediaKey', 'platform id')):
+    """Canonical (platform, id) identity of a media URL; id may be None"""
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.platform}:{self.id}" if self.id else self.platform
+
+
+def _split(url):
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    try:
+        return urlsplit(url)
+    except ValueError:
+        return None
+
+
+def normalize_url(url):
+    """Return the :class:`MediaKey` of ``url`` or None for unknown sites.
+
+    ``id`` is None when the platform is known but the link carries no
+    video ID (e.g. ``t.co`` short links or channel pages).
+    """
+    if not url:
+        return None
+    parts = _split(url)
+    if parts is None:
+        return None
+    host = (parts.hostname or '').lower()
+
+    if _YOUTUBE_HOST_RE.match(host):
+        if host.endswith('youtu.be'):
+            match = _YOUTU_BE_PATH_RE.match(parts.path)
+        else:
+            match = _YOUTUBE_PATH_RE.match(parts.path)
+            if match is None and parts.path.rstrip('/') == '/watch':
+                video_id = parse_qs(parts.query).get('v', [''])[0]
+                if _YOUTUBE_ID_RE.match(video_id):
+                    return MediaKey('youtube', video_id)
+        return MediaKey('youtube', match.group(1) if match else None)
+
+    if _TWITTER_HOST_RE.match(host):
+        match = _TWITTER_STATUS_RE.match(parts.path)
+        return MediaKey('twitter', match.group(1) if match else None)
+
+    return None
+
+
+def detect_platform(url):
+    """Detectar plataforma"""
+    key = normalize_url(url)
+    return key.platform if key else None
+
+
+def media_key(url):
+    """``platform:id`` string for ``url`` or None when no ID can be derived"""
+    key = normalize_url(url)
+    if key is None or key.id is None:
+        return None
+    return str(key)
+
+
+def dedupe_key(url):
+    """Identity used for dedupe: the media key, falling back to the URL"""
+    return media_key(url) or url.strip()
+
+
+def is_collection_url(url):
+    """True for YouTube playlist / channel links (many videos, no single video ID)"""
+    key = normalize_url(url)
+    if key is None or key.platform != 'youtube' or key.id is not None:
+        return False
+    parts = _split(url)
+    path = parts.path.rstrip('/')
+    return (path == '/playlist' or 'list' in parse_qs(parts.query)
+            or path.startswith(_CHANNEL_PREFIXES))
+
+
+def canonical_url(key):
+    """Canonical watch URL for a ``platform:id`` key"""
+    platform, _, video_id = key.partition(':')
+    if platform == 'youtube':
+        return f"https://www.youtube.com/watch?v={video_id}"
+    if platform == 'twitter':
+        return f"https://x.com/i/status/{video_id}"
+    return None
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediaSlayer - yt-dlp loader
+Importação preguiçosa do yt-dlp: a janela aparece primeiro e o import
+pesado acontece numa thread de fundo (ou no primeiro uso).
+"""
+
+import threading
+import time
+
+from startup_profile import PROFILE
+
+_lock = threading.Lock()
+_module = None
+
+
+def load_yt_dlp():
+    """Return the ``yt_dlp`` module, importing it on first use"""
+    global _module
+    if _module is not None:
+        return _module
+    with _lock:
+        if _module is None:
+            start = time.perf_counter()
+            import yt_dlp
+            import yt_dlp.utils  # noqa: F401
+            PROFILE.add_span("import yt_dlp", start, time.perf_counter())
+            _module = yt_dlp
+    return _module
+
+
+def is_loaded():
+    return _module is not None
+
+
+def preload_async():
+    """Warm the import on a background thread"""
+    if _module is None:
+        threading.Thread(target=load_yt_dlp, name="MediaSlayerYtdlpPreload", daemon=True).start()